@@ -0,0 +1,30 @@
+"""Compile the Jinja2 templates when the package is built."""
+
+import importlib.util
+from pathlib import Path
+from typing import Any
+
+
+def pdm_build_initialize(context: Any) -> None:
+    """Add the templates compiled to python modules to the wheel.
+
+    The templates adapter is loaded from its file, as the package dependencies are
+    not installed in the build environment. The editable installs and the source
+    distributions use the source templates.
+
+    Args:
+        context: pdm-backend build context.
+    """
+    if context.target != "wheel":
+        return
+
+    spec = importlib.util.spec_from_file_location(
+        "mkdocs_newsletter_templates",
+        Path(context.root) / "src/mkdocs_newsletter/adapters/templates.py",
+    )
+    templates = importlib.util.module_from_spec(spec)  # type: ignore
+    spec.loader.exec_module(templates)  # type: ignore
+
+    # The files of the build directory are added to the distribution
+    compiled_dir = Path(context.ensure_build_dir()) / "mkdocs_newsletter"
+    templates.compile_templates(str(compiled_dir / "compiled_templates"))
@@ -0,0 +1,240 @@
+"""Define the functions to write the generated files safely."""
+
+import hashlib
+import os
+import tempfile
+from contextlib import suppress
+from types import TracebackType
+from typing import Iterable, List, NamedTuple, Optional, Tuple, Type
+
+BLOCK_SIZE = 64 * 1024
+
+
+def _current_umask() -> int:
+    """Return the umask of the process without changing it."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# Mode of the new files, the one open() would give them. It's read once because
+# reading the umask changes it for a moment, which is not safe with threads.
+DEFAULT_MODE = 0o666 & ~_current_umask()
+
+
+def file_digest(path: str) -> Optional[bytes]:
+    """Calculate the sha256 digest of a file reading it in blocks.
+
+    Args:
+        path: Path of the file.
+
+    Returns:
+        The digest of the file content, None if the file doesn't exist.
+    """
+    digest = hashlib.sha256()
+    try:
+        with open(path, "rb") as file_descriptor:
+            for block in iter(lambda: file_descriptor.read(BLOCK_SIZE), b""):
+                digest.update(block)
+    except FileNotFoundError:
+        return None
+    return digest.digest()
+
+
+def write_temporary(path: str, content: Iterable[bytes], fsync: bool = False) -> str:
+    """Write the content to a temporary file in the same directory as the path.
+
+    The temporary file name starts with a dot, so MkDocs ignores it if it's left
+    behind by an interrupted build. It gets the mode of the file it replaces, or
+    the default one of new files, so the web servers can still read it.
+
+    Args:
+        path: Final path of the file.
+        content: Chunks of data to write, they're written as they're produced.
+        fsync: Whether to flush the data to the disk before returning.
+
+    Returns:
+        Path of the temporary file.
+    """
+    directory, file_name = os.path.split(path)
+    file_descriptor, temporary_path = tempfile.mkstemp(
+        prefix=f".{file_name}.", suffix=".tmp", dir=directory
+    )
+    try:
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            mode = DEFAULT_MODE
+        os.fchmod(file_descriptor, mode)
+        with os.fdopen(file_descriptor, "wb") as temporary_file:
+            for chunk in content:
+                temporary_file.write(chunk)
+            if fsync:
+                temporary_file.flush()
+                os.fsync(temporary_file.fileno())
+    except BaseException:
+        os.remove(temporary_path)
+        raise
+    return temporary_path
+
+
+class FileWrite(NamedTuple):
+    """Represent the result of writing a file that may be unchanged.
+
+    Attributes:
+        temporary_path: Path of the temporary file with the new content, None if the
+            file was not written.
+        digest: sha256 hex digest of the content generated for the file.
+        edited: Whether the file was left untouched because it was edited by hand.
+    """
+
+    temporary_path: Optional[str]
+    digest: str
+    edited: bool = False
+
+
+def write_if_changed(
+    path: str,
+    content: Iterable[str],
+    expected_digest: Optional[str] = None,
+    fsync: bool = False,
+) -> FileWrite:
+    """Write the content to a temporary file unless the file has the same content.
+
+    If the file digest doesn't match the one of the content last generated for it,
+    the file was edited by hand and it's left untouched without rendering the
+    content.
+
+    The content is rendered in memory and compared with the existing file before
+    anything is written, so the unchanged files and their directory are not
+    touched. Otherwise the file watchers, like the one of `mkdocs serve`, would
+    rebuild the site for each temporary file.
+
+    Args:
+        path: Path of the file to write.
+        content: Chunks of text to write.
+        expected_digest: Digest of the content last generated for the file, None if
+            it's unknown.
+        fsync: Whether to flush the temporary file to the disk.
+
+    Returns:
+        The result of writing the file.
+    """
+    current_digest = file_digest(path)
+    if (
+        current_digest is not None
+        and expected_digest is not None
+        and current_digest.hex() != expected_digest
+    ):
+        return FileWrite(temporary_path=None, digest=expected_digest, edited=True)
+
+    digest = hashlib.sha256()
+    data = []
+    for chunk in content:
+        data.append(chunk.encode("utf-8"))
+        digest.update(data[-1])
+    if current_digest == digest.digest():
+        return FileWrite(temporary_path=None, digest=digest.hexdigest())
+    return FileWrite(
+        temporary_path=write_temporary(path, data, fsync), digest=digest.hexdigest()
+    )
+
+
+class FileBatch:
+    """Write a group of files atomically.
+
+    The files are written to temporary files that replace the final ones only when
+    the batch is committed, so an interrupted or concurrent build never leaves
+    truncated files. If the batch fails the temporary files are removed.
+
+    Attributes:
+        fsync: Whether to flush the files and their directories to the disk.
+        pending: Temporary and final path of each file of the batch.
+    """
+
+    def __init__(self, fsync: bool = False) -> None:
+        """Initialize the batch."""
+        self.fsync = fsync
+        self.pending: List[Tuple[str, str]] = []
+
+    def write(self, path: str, content: str) -> None:
+        """Add a file with its content to the batch.
+
+        Args:
+            path: Final path of the file.
+            content: Text to write.
+        """
+        self.add(write_temporary(path, [content.encode("utf-8")], self.fsync), path)
+
+    def write_if_changed(self, path: str, content: str) -> bool:
+        """Add a file with its content to the batch unless it already has it.
+
+        Args:
+            path: Final path of the file.
+            content: Text to write.
+
+        Returns:
+            Whether the file was added to the batch.
+        """
+        write = write_if_changed(path, [content], fsync=self.fsync)
+        if write.temporary_path is None:
+            return False
+        self.add(write.temporary_path, path)
+        return True
+
+    def add(self, temporary_path: str, path: str) -> None:
+        """Add a temporary file already written to the batch.
+
+        Args:
+            temporary_path: Path of the temporary file.
+            path: Final path of the file.
+        """
+        self.pending.append((temporary_path, path))
+
+    def commit(self) -> None:
+        """Replace the final files with the temporary ones.
+
+        If a file can't be replaced, the temporary files that were not committed
+        yet are removed.
+        """
+        directories = set()
+        committed = 0
+        try:
+            for temporary_path, path in self.pending:
+                os.replace(temporary_path, path)
+                directories.add(os.path.dirname(path))
+                committed += 1
+        finally:
+            self.pending = self.pending[committed:]
+            self.rollback()
+
+        if self.fsync:
+            for directory in directories:
+                directory_descriptor = os.open(directory, os.O_RDONLY)
+                try:
+                    os.fsync(directory_descriptor)
+                finally:
+                    os.close(directory_descriptor)
+
+    def rollback(self) -> None:
+        """Remove the temporary files of the batch."""
+        for temporary_path, _ in self.pending:
+            with suppress(FileNotFoundError):
+                os.remove(temporary_path)
+        self.pending = []
+
+    def __enter__(self) -> "FileBatch":
+        """Start the batch."""
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc_value: Optional[BaseException],
+        traceback: Optional[TracebackType],
+    ) -> None:
+        """Commit the batch if there was no error, otherwise roll it back."""
+        if exc_type is None:
+            self.commit()
+        else:
+            self.rollback()
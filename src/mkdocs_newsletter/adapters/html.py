@@ -0,0 +1,138 @@
+"""Extract the newsletter articles from the pages built by MkDocs.
+
+The built pages hold the whole site navigation, so most of their content is not
+needed. The newsletter articles are surrounded by markers, so the `article`
+element is sliced out of the page without reading the rest of it. Only the
+`article` element is parsed, with the parser chosen by the caller or the fastest
+one that is installed: `lxml` if it's available, otherwise the python
+`html.parser`.
+"""
+
+import hashlib
+import mmap
+from functools import lru_cache
+from importlib.util import find_spec
+from typing import Optional, Union
+
+# SoupStrainer is exported by every version of bs4, but it's not in its __all__
+from bs4 import SoupStrainer  # type: ignore[attr-defined]
+from bs4 import BeautifulSoup, Comment, Tag
+
+PARSERS = ("lxml", "html.parser")
+ARTICLE_BEGIN = "<!-- mkdocs-newsletter:article-begin -->"
+ARTICLE_END = "<!-- mkdocs-newsletter:article-end -->"
+
+
+@lru_cache(maxsize=None)
+def default_parser() -> str:
+    """Return the first parser of PARSERS that is installed."""
+    return "lxml" if find_spec("lxml") is not None else "html.parser"
+
+
+def read_article(path: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse the article element of a built newsletter page.
+
+    The page is memory mapped, and if it has the article markers only the article
+    that contains them is parsed. The pages without markers, like the ones built
+    from articles created by older versions or edited by hand, are parsed whole.
+
+    Args:
+        path: Path of the built page.
+        parser: One of PARSERS, if None the one of default_parser.
+
+    Returns:
+        Document with the article.
+    """
+    with open(path, "rb") as page_file:
+        try:
+            page = mmap.mmap(page_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files can't be mapped
+            return parse_article("", parser)
+        with page:
+            article = _slice_article(page)
+            if article is None:
+                article = page[:]
+    return parse_article(article.decode("utf-8"), parser)
+
+
+def article_digest(path: str) -> Optional[bytes]:
+    """Calculate the sha256 digest of the article element of a built page.
+
+    The rest of the page, like the site navigation, changes each time a newsletter
+    is published, so only the article tells if its content changed. The pages
+    without markers are digested whole.
+
+    Args:
+        path: Path of the built page.
+
+    Returns:
+        The digest of the article, None if the page doesn't exist.
+    """
+    try:
+        with open(path, "rb") as page_file:
+            try:
+                page = mmap.mmap(page_file.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # Empty files can't be mapped
+                return hashlib.sha256(b"").digest()
+            with page:
+                article = _slice_article(page)
+                return hashlib.sha256(page[:] if article is None else article).digest()
+    except FileNotFoundError:
+        return None
+
+
+def _slice_article(page: Union[bytes, mmap.mmap]) -> Optional[bytes]:
+    """Return the article element that contains the article markers.
+
+    Args:
+        page: Content of the built page.
+
+    Returns:
+        The article element, or None if the page doesn't have the markers.
+    """
+    begin = page.find(ARTICLE_BEGIN.encode())
+    if begin == -1:
+        return None
+    end = page.find(ARTICLE_END.encode(), begin)
+    if end == -1:
+        return None
+    start = page.rfind(b"<article", 0, begin)
+    stop = page.find(b"</article>", end)
+    if start == -1 or stop == -1:
+        return None
+    return page[start : stop + len(b"</article>")]
+
+
+def parse_article(html: str, parser: Optional[str] = None) -> BeautifulSoup:
+    """Parse only the article element of a built page.
+
+    Args:
+        html: Content of the built page.
+        parser: One of PARSERS, if None the one of default_parser.
+
+    Returns:
+        Document with the article, the rest of the page is skipped while parsing.
+    """
+    return BeautifulSoup(
+        html, parser or default_parser(), parse_only=SoupStrainer("article")
+    )
+
+
+def remove_article_markers(article: Tag) -> None:
+    """Remove the article markers and the blank line they leave from an article.
+
+    Args:
+        article: Article element.
+    """
+    markers = {ARTICLE_BEGIN[4:-3], ARTICLE_END[4:-3]}
+    for comment in article.find_all(string=lambda text: isinstance(text, Comment)):
+        if comment in markers:
+            # The markers are in their own paragraph, so they leave a blank line
+            if (
+                isinstance(comment.next_sibling, str)
+                and not comment.next_sibling.strip()
+            ):
+                comment.next_sibling.extract()
+            comment.extract()
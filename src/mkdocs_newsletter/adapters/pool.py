@@ -0,0 +1,51 @@
+"""Run independent tasks in a pool of threads or processes."""
+
+from concurrent.futures import (
+    Executor,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+)
+from typing import Any, Callable, List, Optional, Sequence, Tuple, TypeVar
+
+Result = TypeVar("Result")
+
+
+def run_pool(
+    func: Callable[..., Result],
+    args: Sequence[Tuple[Any, ...]],
+    workers: int,
+    executor: str = "thread",
+    initializer: Optional[Callable[[], Any]] = None,
+) -> List["Future[Result]"]:
+    """Call a function once with each group of arguments in a pool of workers.
+
+    The pool is shut down once all the calls finish, so the futures already have
+    their results or errors.
+
+    Args:
+        func: Function to call, it must be picklable to use processes.
+        args: Arguments of each call.
+        workers: Number of workers of the pool, at least 1.
+        executor: Type of the workers, either "thread" or "process".
+        initializer: Function that prepares each process worker, it must be
+            picklable. The thread workers share the state of the build, so they
+            don't need it.
+
+    Returns:
+        The future of each call, in the same order as the arguments regardless of
+            when each of them finished.
+
+    Raises:
+        ValueError: If the executor is not valid.
+    """
+    workers_pool: Executor
+    if executor == "thread":
+        workers_pool = ThreadPoolExecutor(max_workers=workers)
+    elif executor == "process":
+        workers_pool = ProcessPoolExecutor(max_workers=workers, initializer=initializer)
+    else:
+        raise ValueError(f"Unknown executor {executor}, use thread or process")
+
+    with workers_pool:
+        return [workers_pool.submit(func, *call_args) for call_args in args]
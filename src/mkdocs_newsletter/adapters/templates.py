@@ -0,0 +1,187 @@
+"""Define the Jinja2 environment shared by all the services.
+
+The templates are compiled to python modules when the package is built, so the
+processes don't need to parse and compile them. The source templates are used
+instead when the compiled ones are missing or outdated, and the templates of the
+user's templates directory take precedence over both.
+"""
+
+import hashlib
+import os
+from functools import lru_cache
+from typing import List, Optional
+
+from jinja2 import (
+    BaseLoader,
+    ChoiceLoader,
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    ModuleLoader,
+    PackageLoader,
+    Template,
+    select_autoescape,
+)
+
+PACKAGE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEMPLATES_DIR = os.path.join(PACKAGE_DIR, "templates")
+COMPILED_TEMPLATES_DIR = os.path.join(PACKAGE_DIR, "compiled_templates")
+DIGEST_FILE = "templates.sha256"
+
+
+@lru_cache(maxsize=None)
+def get_environment() -> Environment:
+    """Return the Jinja2 environment shared by all the services.
+
+    It's created the first time it's needed, and it keeps the compiled templates,
+    so each template is compiled once per process.
+    """
+    return _create_environment(_build_loader())
+
+
+def _create_environment(loader: BaseLoader) -> Environment:
+    """Create a Jinja2 environment with the settings of the package templates.
+
+    The templates compiled at build time must be compiled with the same settings as
+    the environment that loads them.
+
+    Args:
+        loader: Loader of the templates.
+    """
+    return Environment(
+        loader=loader,
+        autoescape=select_autoescape(["html", "xml"]),
+    )
+
+
+def _build_loader(
+    templates_dir: Optional[str] = None,
+    compiled_dir: str = COMPILED_TEMPLATES_DIR,
+) -> ChoiceLoader:
+    """Build the loader of the templates.
+
+    Args:
+        templates_dir: Directory with the templates that override the package ones.
+        compiled_dir: Directory with the package templates compiled to modules.
+
+    Returns:
+        Loader that looks for the templates in the user directory, then in the
+            compiled templates if they're up to date, and then in the package.
+    """
+    loaders: List[BaseLoader] = []
+    if templates_dir is not None:
+        loaders.append(FileSystemLoader(templates_dir))
+    if _compiled_templates_digest(compiled_dir) == _templates_digest():
+        loaders.append(ModuleLoader(compiled_dir))
+    loaders.append(PackageLoader("mkdocs_newsletter", "templates"))
+    return ChoiceLoader(loaders)
+
+
+def _templates_digest() -> str:
+    """Calculate the digest of the package source templates."""
+    digest = hashlib.sha256()
+    for name in sorted(os.listdir(TEMPLATES_DIR)):
+        digest.update(name.encode("utf-8"))
+        with open(os.path.join(TEMPLATES_DIR, name), "rb") as template_file:
+            digest.update(template_file.read())
+    return digest.hexdigest()
+
+
+def _compiled_templates_digest(compiled_dir: str) -> Optional[str]:
+    """Read the digest of the source templates the compiled ones were built from.
+
+    Args:
+        compiled_dir: Directory with the compiled templates.
+
+    Returns:
+        The digest, or None if there are no compiled templates.
+    """
+    try:
+        with open(
+            os.path.join(compiled_dir, DIGEST_FILE), "r", encoding="utf-8"
+        ) as digest_file:
+            return digest_file.read().strip()
+    except FileNotFoundError:
+        return None
+
+
+def compile_templates(target_dir: str = COMPILED_TEMPLATES_DIR) -> None:
+    """Compile the package templates to python modules.
+
+    It's run when the package is built. The digest of the source templates is
+    stored with the modules, so they're ignored if the templates change afterwards.
+
+    Args:
+        target_dir: Directory to store the compiled templates.
+    """
+    os.makedirs(target_dir, exist_ok=True)
+    environment = _create_environment(FileSystemLoader(TEMPLATES_DIR))
+    environment.compile_templates(target_dir, zip=None, ignore_errors=False)
+    with open(
+        os.path.join(target_dir, DIGEST_FILE), "w", encoding="utf-8"
+    ) as digest_file:
+        digest_file.write(_templates_digest())
+
+
+def get_template(name: str) -> Template:
+    """Return a compiled template of the shared environment.
+
+    Args:
+        name: File name of the template.
+    """
+    return get_environment().get_template(name)
+
+
+def set_templates_dir(templates_dir: Optional[str]) -> None:
+    """Use the templates of a directory instead of the package ones.
+
+    The directory only needs to hold the templates that are overridden.
+
+    Args:
+        templates_dir: Directory with the templates, if None only the package
+            templates are used.
+    """
+    environment = get_environment()
+    environment.loader = _build_loader(templates_dir)
+    if environment.cache is not None:
+        environment.cache.clear()
+
+
+def set_bytecode_cache(cache_dir: Optional[str]) -> None:
+    """Store the compiled templates in a directory.
+
+    The directory is shared by all the processes that use it, so the templates are
+    compiled once per machine.
+
+    Args:
+        cache_dir: Directory to store the compiled templates, if None the templates
+            are only cached in memory.
+    """
+    environment = get_environment()
+    if cache_dir is None:
+        environment.bytecode_cache = None
+        return
+    os.makedirs(cache_dir, exist_ok=True)
+    environment.bytecode_cache = FileSystemBytecodeCache(cache_dir)
+
+
+def configure_templates(
+    templates_dir: Optional[str] = None, cache_dir: Optional[str] = None
+) -> None:
+    """Configure the templates directory and the bytecode cache of the environment.
+
+    Both are always set, so the ones of a previous build don't remain once they're
+    removed from the configuration. It's also the initializer of the process
+    workers, as the spawned processes don't inherit the environment of the build.
+
+    Args:
+        templates_dir: Directory with the templates that override the package ones,
+            if None only the package templates are used.
+        cache_dir: Directory of the data reused between builds, the compiled
+            templates are stored in its `templates` subdirectory. If None they're
+            only cached in memory.
+    """
+    set_bytecode_cache(
+        None if cache_dir is None else os.path.join(cache_dir, "templates")
+    )
+    set_templates_dir(templates_dir)
@@ -0,0 +1,86 @@
+// Search the newsletters in the shard written by the search_shard option.
+//
+// The shard is only downloaded the first time the reader types in the search box,
+// and the matching newsletters are shown below the results of the theme. It works
+// with the search box of the mkdocs and Material themes.
+(function () {
+  "use strict";
+
+  var script = document.currentScript;
+  var shardUrl = new URL("newsletter_index.json", script.src);
+  var siteUrl = new URL("../", script.src);
+  var maxResults = 10;
+  var shard = null;
+
+  function loadShard() {
+    if (shard === null) {
+      shard = fetch(shardUrl)
+        .then(function (response) {
+          return response.ok ? response.json() : { docs: [] };
+        })
+        .catch(function () {
+          return { docs: [] };
+        });
+    }
+    return shard;
+  }
+
+  function resultsBox(input) {
+    var box = document.getElementById("newsletter-search-results");
+    if (box !== null) {
+      return box;
+    }
+    var results =
+      document.getElementById("mkdocs-search-results") ||
+      document.querySelector(".md-search-result") ||
+      input.parentNode;
+    box = document.createElement("div");
+    box.id = "newsletter-search-results";
+    results.parentNode.insertBefore(box, results.nextSibling);
+    return box;
+  }
+
+  function render(input, docs) {
+    var words = input.value.toLowerCase().split(/\s+/).filter(Boolean);
+    var box = resultsBox(input);
+    box.textContent = "";
+    if (words.length === 0) {
+      return;
+    }
+    var matches = docs.filter(function (doc) {
+      var text = (doc.title + "\n" + doc.text).toLowerCase();
+      return words.every(function (word) {
+        return text.indexOf(word) !== -1;
+      });
+    });
+    if (matches.length === 0) {
+      return;
+    }
+    var title = document.createElement("h3");
+    title.textContent = "Newsletters";
+    var list = document.createElement("ul");
+    matches.slice(0, maxResults).forEach(function (doc) {
+      var link = document.createElement("a");
+      link.href = new URL(doc.location, siteUrl).href;
+      link.textContent = doc.title;
+      var item = document.createElement("li");
+      item.appendChild(link);
+      list.appendChild(item);
+    });
+    box.appendChild(title);
+    box.appendChild(list);
+  }
+
+  document.addEventListener("input", function (event) {
+    var input = event.target;
+    if (
+      input.id !== "mkdocs-search-query" &&
+      input.getAttribute("data-md-component") !== "search-query"
+    ) {
+      return;
+    }
+    loadShard().then(function (index) {
+      render(input, index.docs);
+    });
+  });
+})();
@@ -1,22 +1,42 @@
 """Define the mkdocs plugin."""
 
+import logging
 import os
 from typing import Optional
 
 from git import Repo
+from mkdocs.config import config_options
 from mkdocs.config.defaults import MkDocsConfig
-from mkdocs.plugins import BasePlugin
-
+from mkdocs.exceptions import PluginError
+from mkdocs.plugins import BasePlugin, event_priority
+
+from ..adapters.html import PARSERS
+from ..adapters.templates import configure_templates
+from ..model import (
+    DEFAULT_FEEDS,
+    BuildStats,
+    LastNewsletter,
+    NewsletterLayout,
+    NewsletterManifest,
+    NewsletterOptions,
+)
 from ..services.git import semantic_changes
+from ..services.layout import compact_newsletters, create_redirects, migrate_layout
+from ..services.manifest import load_manifest
 from ..services.nav import build_nav
 from ..services.newsletter import (
     add_change_categories,
+    backfill_newsletters,
     create_newsletter_landing_page,
     create_newsletters,
     digital_garden_changes,
+    get_periods,
     last_newsletter_changes,
 )
 from ..services.rss import create_rss
+from ..services.search import add_search_loader, split_search_index
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 
 
 # Class cannot subclass 'BasePlugin' (has type 'Any'). It's how the docs say you need
@@ -24,21 +44,47 @@ from ..services.rss import create_rss
 class Newsletter(BasePlugin):  # type: ignore
     """Define the MkDocs plugin to create newsletters."""
 
+    config_scheme = (
+        ("feeds", config_options.Type(list, default=DEFAULT_FEEDS)),
+        ("merge_threshold", config_options.Type(int, default=0)),
+        ("cache_dir", config_options.Type(str, default="")),
+        ("templates_dir", config_options.Type(str, default="")),
+        ("workers", config_options.Type(int, default=0)),
+        ("executor", config_options.Choice(("thread", "process"), default="thread")),
+        ("fsync", config_options.Type(bool, default=False)),
+        ("regenerate", config_options.Type(bool, default=False)),
+        ("backfill", config_options.Type(bool, default=False)),
+        ("layout", config_options.Choice(("flat", "year", "month"), default="flat")),
+        ("nav_window", config_options.Type(int, default=0)),
+        ("retention_days", config_options.Type(int, default=0)),
+        ("search_shard", config_options.Type(bool, default=False)),
+        (
+            "html_parser",
+            config_options.Choice(("auto", *PARSERS), default="auto"),
+        ),
+    )
+
     def __init__(self) -> None:
         """Initialize the basic attributes.
 
         Attributes:
             repo: Git repository to analyze.
+            options: Options of the build, read from the plugin configuration.
+            manifest: Snapshot of the newsletter directory taken in on_config and
+                updated with the written articles, shared by all the build steps.
         """
         self.working_dir = os.getenv("NEWSLETTER_WORKING_DIR", default=os.getcwd())
         self.repo = Repo(self.working_dir)
+        self.options = NewsletterOptions()
+        self.manifest: Optional[NewsletterManifest] = None
 
     def on_config(self, config: Optional[MkDocsConfig]) -> MkDocsConfig:
         """Create the new newsletters and load them in the navigation.
 
         Through the following steps:
 
-        * Detect which were the last changes for each of the feeds.
+        * Detect which were the last changes for each of the feeds, unless all the
+            newsletters are regenerated.
         * Parse the changes from the git history that were done before the last
             changes.
         * Create the newsletter articles.
@@ -53,26 +99,123 @@ class Newsletter(BasePlugin):  # type: ignore
         """
         if config is None:
             config = MkDocsConfig()
+        self.options = self._build_options()
+        self._configure_adapters()
         newsletter_dir = f"{self.working_dir}/docs/newsletter"
         if not os.path.exists(newsletter_dir):
             os.makedirs(newsletter_dir)
-        last_published_changes = last_newsletter_changes(newsletter_dir)
+        # Snapshot of the newsletter directory shared by all the steps of the build
+        self.manifest = load_manifest(newsletter_dir)
+        moved = migrate_layout(newsletter_dir, self.options.layout, self.manifest)
+        if moved:
+            log.info(
+                f"Newsletter articles: {moved} moved to the "
+                f"{self.options.layout.value} layout"
+            )
+        if self.config["regenerate"]:
+            last_published_changes = LastNewsletter()
+        else:
+            last_published_changes = last_newsletter_changes(
+                newsletter_dir, self.options.periods, self.manifest
+            )
         changes_to_publish = add_change_categories(
-            semantic_changes(self.repo, last_published_changes.min()), config
+            semantic_changes(
+                self.repo, last_published_changes.min(), self.options.cache_dir
+            ),
+            config,
         )
         changes_per_feed = digital_garden_changes(
             changes_to_publish,
             last_published_changes,
+            self.options.periods,
         )
 
-        create_newsletters(changes_per_feed, self.repo)
-        create_newsletter_landing_page(config, self.repo)
+        create_newsletter_landing_page(
+            config, self.repo, self.options.periods, self.options.fsync
+        )
+
+        stats = BuildStats()
+        if self.config["backfill"]:
+            build_newsletters = backfill_newsletters
+        else:
+            build_newsletters = create_newsletters
+        build_newsletters(
+            changes_per_feed, self.repo, self.options, stats, self.manifest
+        )
+        log.info(
+            f"Newsletter articles: {stats.written} written, "
+            f"{stats.unchanged} unchanged, {stats.edited} edited by hand"
+        )
+        if self.config["retention_days"] > 0:
+            compacted = compact_newsletters(
+                newsletter_dir, self.manifest, self.config["retention_days"]
+            )
+            if compacted:
+                log.info(f"Newsletter articles: {compacted} compacted")
 
-        config = build_nav(config, newsletter_dir)
+        config = build_nav(config, newsletter_dir, self.options, self.manifest)
+        if self.config["search_shard"]:
+            config = add_search_loader(config)
 
         return config
 
-    # The * in the signature is to mimic the parent class signature
+    def _build_options(self) -> NewsletterOptions:
+        """Read the options of the build from the plugin configuration.
+
+        Raises:
+            PluginError: If a feed is not a valid newsletter type.
+        """
+        try:
+            periods = get_periods(self.config["feeds"])
+        except ValueError as error:
+            raise PluginError(str(error)) from error
+        cache_dir = None
+        if self.config["cache_dir"]:
+            cache_dir = os.path.join(self.working_dir, self.config["cache_dir"])
+        templates_dir = None
+        if self.config["templates_dir"]:
+            templates_dir = os.path.join(self.working_dir, self.config["templates_dir"])
+        return NewsletterOptions(
+            periods=periods,
+            merge_threshold=self.config["merge_threshold"],
+            workers=self.config["workers"],
+            executor=self.config["executor"],
+            fsync=self.config["fsync"],
+            layout=NewsletterLayout(self.config["layout"]),
+            nav_window=self.config["nav_window"],
+            cache_dir=cache_dir,
+            templates_dir=templates_dir,
+            html_parser=(
+                None
+                if self.config["html_parser"] == "auto"
+                else self.config["html_parser"]
+            ),
+        )
+
+    def _configure_adapters(self) -> None:
+        """Configure the templates shared by the services.
+
+        They're configured on each build, so the options removed while `mkdocs
+        serve` runs don't remain in the shared environment.
+        """
+        configure_templates(self.options.templates_dir, self.options.cache_dir)
+
+    # The * in the signature is to mimic the parent class signature. It runs after
+    # the other plugins, so the search index is already written.
+    @event_priority(-100)
     def on_post_build(self, *, config: MkDocsConfig) -> None:
-        """Create the RSS feeds."""
-        create_rss(config, self.working_dir)
+        """Create the RSS feeds, the redirects and the newsletter search shard."""
+        stats = BuildStats()
+        create_rss(config, self.working_dir, self.options, self.manifest, stats)
+        log.info(
+            f"Newsletter RSS entries: {stats.feed_entries_cached} cached, "
+            f"{stats.feed_entries_parsed} parsed"
+        )
+        if self.manifest is not None:
+            create_redirects(
+                config, self.working_dir, self.manifest, self.options.fsync
+            )
+            if self.config["search_shard"]:
+                split_search_index(
+                    config, self.working_dir, self.manifest, self.options.fsync
+                )
@@ -1,14 +1,16 @@
 """Module to store the common business model of all entities."""
 
+import calendar
 import os
 import re
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from enum import Enum
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
 
 from dateutil import tz
-from pydantic import BaseModel, Field, HttpUrl
+from pydantic import BaseModel, Field, HttpUrl, PrivateAttr
 
 
 class Change(BaseModel):
@@ -54,60 +56,349 @@ class DigitalGardenChanges(BaseModel):
     daily: List[Change] = Field(default_factory=list)
     weekly: List[Change] = Field(default_factory=list)
     monthly: List[Change] = Field(default_factory=list)
+    quarterly: List[Change] = Field(default_factory=list)
     yearly: List[Change] = Field(default_factory=list)
 
 
 class NewsletterType(str, Enum):
-    """Defines the possible newsletter types."""
+    """Defines the possible newsletter types.
+
+    They are sorted from the coarser to the finer period.
+    """
 
     YEARLY = "yearly"
+    QUARTERLY = "quarterly"
     MONTHLY = "monthly"
     WEEKLY = "weekly"
     DAILY = "daily"
 
 
+class PeriodSpan(NamedTuple):
+    """Represent one occurrence of a period in the calendar.
+
+    Attributes:
+        key: basename of the newsletter file of the period.
+        start: first day of the period.
+        end: first day of the next period.
+        level: position of the period inside its parent period, used by the nav.
+        title: human readable name of the period.
+    """
+
+    key: str
+    start: date
+    end: date
+    level: int
+    title: str
+
+
+class CalendarYear(NamedTuple):
+    """Store the precomputed periods of a year.
+
+    Attributes:
+        days: Period spans of each newsletter type indexed by the day of the year.
+        spans: Period spans indexed by their key.
+    """
+
+    days: List[Dict[NewsletterType, PeriodSpan]]
+    spans: Dict[str, PeriodSpan]
+
+
+@lru_cache(maxsize=None)
+def calendar_year(year: int) -> CalendarYear:
+    """Precompute the periods of every day of a year.
+
+    Weeks follow the `%W` numbering, so the days before the first Monday belong to
+    the week 0, and the weeks are cut at the year boundaries.
+
+    Args:
+        year: Year to compute.
+
+    Returns:
+        The calendar table of the year.
+    """
+    first_day = date(year, 1, 1)
+    next_year = date(year + 1, 1, 1)
+    spans: Dict[str, PeriodSpan] = {}
+
+    def span(key: str, start: date, end: date, level: int, title: str) -> PeriodSpan:
+        return spans.setdefault(key, PeriodSpan(key, start, end, level, title))
+
+    days = []
+    day = first_day
+    while day < next_year:
+        week = int(day.strftime("%W"))
+        month_start = day.replace(day=1)
+        month_end = (month_start + timedelta(days=31)).replace(day=1)
+        quarter = (day.month - 1) // 3 + 1
+        quarter_start = date(year, 3 * quarter - 2, 1)
+        quarter_end = date(year, 3 * quarter + 1, 1) if quarter < 4 else next_year
+        days.append(
+            {
+                NewsletterType.YEARLY: span(
+                    f"{year}", first_day, next_year, year, str(year)
+                ),
+                NewsletterType.QUARTERLY: span(
+                    f"{year}_q{quarter}",
+                    quarter_start,
+                    quarter_end,
+                    quarter,
+                    f"{_int_to_ordinal(quarter)} Quarter of {year}",
+                ),
+                NewsletterType.MONTHLY: span(
+                    f"{year}_{day.month:02}",
+                    month_start,
+                    month_end,
+                    day.month,
+                    f"{calendar.month_name[day.month]} of {year}",
+                ),
+                NewsletterType.WEEKLY: span(
+                    f"{year}_w{week:02}",
+                    max(day - timedelta(days=day.weekday()), first_day),
+                    min(day + timedelta(days=7 - day.weekday()), next_year),
+                    week,
+                    f"{_int_to_ordinal(week)} Week of {year}",
+                ),
+                NewsletterType.DAILY: span(
+                    day.strftime("%Y_%m_%d"),
+                    day,
+                    day + timedelta(days=1),
+                    day.day,
+                    f"{_int_to_ordinal(day.day)} {calendar.month_name[day.month]} "
+                    f"{year}",
+                ),
+            }
+        )
+        day += timedelta(days=1)
+
+    return CalendarYear(days=days, spans=spans)
+
+
+def calendar_day(date_: Union[date, datetime]) -> Dict[NewsletterType, PeriodSpan]:
+    """Return the period spans of each newsletter type that contain the date."""
+    return calendar_year(date_.year).days[date_.timetuple().tm_yday - 1]
+
+
+def _int_to_ordinal(number: int) -> str:
+    """Convert an integer into its ordinal representation.
+
+    Args:
+        number: Number to convert
+
+    Returns:
+        ordinal representation of the number
+    """
+    suffix = ["th", "st", "nd", "rd", "th"][min(number % 10, 4)]
+    if 11 <= (number % 100) <= 13:
+        suffix = "th"
+    return f"{number}{suffix}"
+
+
+class Period(BaseModel):
+    """Represent the cadence of a newsletter feed.
+
+    The boundaries, file keys and titles are read from the precomputed calendar
+    table.
+
+    Attributes:
+        type_: Newsletter type built with the period.
+        ttl: Minutes that the RSS readers should cache the feed.
+        regex: Regular expression that matches the basename of the articles.
+    """
+
+    type_: NewsletterType
+    ttl: int
+    regex: str
+
+    def span(self, date_: Union[date, datetime]) -> PeriodSpan:
+        """Return the period span that contains the date."""
+        return calendar_day(date_)[self.type_]
+
+    def key(self, date_: Union[date, datetime]) -> str:
+        """Return the newsletter basename of the period that contains the date."""
+        return self.span(date_).key
+
+    def file_name(self, date_: Union[date, datetime]) -> str:
+        """Return the newsletter file name of the period that contains the date."""
+        return f"{self.key(date_)}.md"
+
+    def start(self, date_: Union[date, datetime]) -> datetime:
+        """Return the first moment of the period that contains the date."""
+        return _local_datetime(self.span(date_).start)
+
+    def next_start(self, date_: Union[date, datetime]) -> datetime:
+        """Return the first moment of the period after the one that contains date."""
+        return _local_datetime(self.span(date_).end)
+
+    def parse(self, basename: str) -> Optional[datetime]:
+        """Return the start of the period of a newsletter basename.
+
+        Returns:
+            None if the basename doesn't belong to this period.
+        """
+        if not re.match(self.regex, basename):
+            return None
+        try:
+            span = calendar_year(int(basename[:4])).spans[basename]
+        except (KeyError, ValueError):
+            return None
+        return _local_datetime(span.start)
+
+
+def _local_datetime(date_: date) -> datetime:
+    """Convert a date into the local datetime of its first moment."""
+    return datetime(date_.year, date_.month, date_.day, tzinfo=tz.tzlocal())
+
+
+PERIODS: Dict[NewsletterType, Period] = {
+    period.type_: period
+    for period in [
+        Period(type_=NewsletterType.YEARLY, ttl=525600, regex=r"\d{4}$"),
+        Period(type_=NewsletterType.QUARTERLY, ttl=129600, regex=r"\d{4}_q\d$"),
+        Period(type_=NewsletterType.MONTHLY, ttl=43200, regex=r"\d{4}_\d{2}$"),
+        Period(type_=NewsletterType.WEEKLY, ttl=10080, regex=r"\d{4}_w\d{2}$"),
+        Period(type_=NewsletterType.DAILY, ttl=1440, regex=r"\d{4}_\d{2}_\d{2}$"),
+    ]
+}
+DEFAULT_FEEDS = ["daily", "weekly", "monthly", "yearly"]
+
+
+class NewsletterLayout(str, Enum):
+    """Define how the newsletter articles are stored in the newsletter directory.
+
+    FLAT stores them all in the directory, YEAR in a subdirectory per year, and MONTH
+    also stores the daily and monthly articles in a subdirectory per month inside
+    the year one.
+    """
+
+    FLAT = "flat"
+    YEAR = "year"
+    MONTH = "month"
+
+    def file_path(self, basename: str) -> str:
+        """Return the path of an article relative to the newsletter directory.
+
+        Args:
+            basename: Basename of the newsletter article.
+        """
+        if self == NewsletterLayout.FLAT:
+            return f"{basename}.md"
+        if self == NewsletterLayout.MONTH and re.match(
+            r"\d{4}_\d{2}(_\d{2})?$", basename
+        ):
+            return f"{basename[:4]}/{basename[5:7]}/{basename}.md"
+        return f"{basename[:4]}/{basename}.md"
+
+
+class NewsletterOptions(BaseModel):
+    """Gather the plugin options that tune how the newsletters are built.
+
+    Attributes:
+        periods: Periods of the enabled feeds sorted from coarser to finer.
+        merge_threshold: Maximum number of changes of the same type and file that are
+            shown in an article before they're merged into one. The articles of the
+            finest feed are never merged. 0 disables it.
+        workers: Number of workers that render the articles and parse the built
+            pages concurrently. 0 does it sequentially.
+        executor: Type of the workers, either "thread" or "process".
+        fsync: Whether to flush the generated files to the disk before replacing
+            the existing ones.
+        layout: Layout of the newsletter directory.
+        nav_window: Number of years whose newsletters are kept in the nav, the older
+            ones are collapsed into archive pages. 0 keeps them all.
+        cache_dir: Directory of the data reused between builds, None disables it.
+        templates_dir: Directory with the templates that override the package ones,
+            None uses the package ones.
+        html_parser: Parser that reads the articles of the built pages, None uses
+            the fastest one that is installed.
+    """
+
+    periods: List[Period] = Field(
+        default_factory=lambda: [
+            period for period in PERIODS.values() if period.type_ in DEFAULT_FEEDS
+        ]
+    )
+    merge_threshold: int = 0
+    workers: int = 0
+    executor: str = "thread"
+    fsync: bool = False
+    layout: NewsletterLayout = NewsletterLayout.FLAT
+    nav_window: int = 0
+    cache_dir: Optional[str] = None
+    templates_dir: Optional[str] = None
+    html_parser: Optional[str] = None
+
+
+class NewsletterName(NamedTuple):
+    """Represent the parsed file name of a newsletter.
+
+    Attributes:
+        basename: File name without the extension, it's also the sort key.
+        type_: Type of the newsletter, None if the name is not a newsletter one.
+        date: Start of the period of the newsletter, None if the name is not a
+            newsletter one.
+    """
+
+    basename: str
+    type_: Optional[str]
+    date: Optional[datetime]
+
+
+def _parse_newsletter_name(file_: Path) -> NewsletterName:
+    """Extract the type and date of a newsletter from its file path."""
+    basename = os.path.splitext(file_.name)[0]
+    for period in PERIODS.values():
+        start = period.parse(basename)
+        if start is not None:
+            return NewsletterName(basename, period.type_.value, start)
+    return NewsletterName(basename, None, None)
+
+
 class Newsletter(BaseModel):
-    """Represents a newsletter."""
+    """Represents a newsletter.
+
+    The file name is parsed once when the object is created.
+    """
 
     file_: Path
+    _name: NewsletterName = PrivateAttr()
+
+    def __init__(self, name: Optional[NewsletterName] = None, **data: Any) -> None:
+        """Parse the file name of the newsletter unless it's already parsed."""
+        super().__init__(**data)
+        self._name = name or _parse_newsletter_name(self.file_)
+
+    @classmethod
+    def from_name(cls, file_: Path, type_: str, date_: datetime) -> "Newsletter":
+        """Create a newsletter whose file name is already parsed.
+
+        Args:
+            file_: Path of the newsletter.
+            type_: Type of the newsletter.
+            date_: Start of the period of the newsletter.
+        """
+        return cls(
+            file_=file_,
+            name=NewsletterName(os.path.splitext(file_.name)[0], type_, date_),
+        )
 
     @property
     def basename(self) -> str:
         """Return the basename of the Newsletter."""
-        return os.path.splitext(self.file_.name)[0]
+        return self._name.basename
 
     @property
     def type_(self) -> str:
         """Return the type of the Newsletter."""
-        if re.match(r"\d{4}$", self.basename):
-            return "yearly"
-        if re.match(r"\d{4}_\d{2}$", self.basename):
-            return "monthly"
-        if re.match(r"\d{4}_w\d{2}$", self.basename):
-            return "weekly"
-        if re.match(r"\d{4}_\d{2}_\d{2}$", self.basename):
-            return "daily"
-        raise ValueError("Can't extract type from file path")
+        if self._name.type_ is None:
+            raise ValueError("Can't extract type from file path")
+        return self._name.type_
 
     @property
     def date(self) -> datetime:
         """Return the date of the Newsletter."""
-        if re.match(r"\d{4}$", self.basename):
-            return datetime(int(self.basename), 1, 1, tzinfo=tz.tzlocal())
-        if re.match(r"\d{4}_\d{2}$", self.basename):
-            year = int(self.basename.split("_")[0])
-            month = int(self.basename.split("_")[1])
-            return datetime(year, month, 1, tzinfo=tz.tzlocal())
-        if re.match(r"\d{4}_w\d{2}$", self.basename):
-            year = int(self.basename.split("_")[0])
-            week = int(self.basename.split("w")[1])
-            first_day = datetime(year, 1, 1, tzinfo=tz.tzlocal())
-            return first_day + timedelta(days=7 * (week - 1) - first_day.weekday())
-        if re.match(r"\d{4}_\d{2}_\d{2}$", self.basename):
-            return datetime.strptime(self.basename, "%Y_%m_%d").replace(
-                tzinfo=tz.tzlocal()
-            )
-        raise ValueError("Can't extract date from file path")
+        if self._name.date is None:
+            raise ValueError("Can't extract date from file path")
+        return self._name.date
 
     def __lt__(self, other: "Newsletter") -> bool:
         """Assert if an object is smaller than us.
@@ -118,7 +409,7 @@ class Newsletter(BaseModel):
         Raises:
             TypeError: If the id type of the objects is not compatible.
         """
-        return self.basename < other.basename
+        return self._name.basename < other._name.basename
 
     def __gt__(self, other: "Newsletter") -> bool:
         """Assert if an object is greater than us.
@@ -129,29 +420,29 @@ class Newsletter(BaseModel):
         Raises:
             TypeError: If the id type of the objects is not compatible.
         """
-        return self.basename > other.basename
+        return self._name.basename > other._name.basename
 
 
 class Newsletters(BaseModel):
     """Represents the newsletters for each feed type."""
 
     yearly: List[Newsletter] = Field(default_factory=list)
+    quarterly: List[Newsletter] = Field(default_factory=list)
     monthly: List[Newsletter] = Field(default_factory=list)
     weekly: List[Newsletter] = Field(default_factory=list)
     daily: List[Newsletter] = Field(default_factory=list)
 
     def sort(self) -> None:
         """Sort the newsletters."""
-        self.yearly = sorted(self.yearly, reverse=True)
-        self.monthly = sorted(self.monthly, reverse=True)
-        self.weekly = sorted(self.weekly, reverse=True)
-        self.daily = sorted(self.daily, reverse=True)
+        for type_ in NewsletterType:
+            setattr(self, type_.value, sorted(getattr(self, type_.value), reverse=True))
 
 
 class LastNewsletter(BaseModel):
     """Represents the last newsletter for each feed type."""
 
     yearly: Optional[datetime] = None
+    quarterly: Optional[datetime] = None
     monthly: Optional[datetime] = None
     weekly: Optional[datetime] = None
     daily: Optional[datetime] = None
@@ -164,6 +455,113 @@ class LastNewsletter(BaseModel):
             return None
 
 
+class BuildStats(BaseModel):
+    """Gather the metrics of a build.
+
+    Attributes:
+        written: Number of newsletter articles written.
+        unchanged: Number of newsletter articles left untouched because their content
+            didn't change.
+        edited: Number of newsletter articles left untouched because they were
+            edited by hand.
+        feed_entries_cached: Number of RSS entries taken from the cache.
+        feed_entries_parsed: Number of RSS entries parsed from the built pages.
+    """
+
+    written: int = 0
+    unchanged: int = 0
+    edited: int = 0
+    feed_entries_cached: int = 0
+    feed_entries_parsed: int = 0
+
+
+class ChangesCache(BaseModel):
+    """Store the semantic changes parsed from each commit.
+
+    Attributes:
+        version: Version of the plugin that parsed the changes.
+        commits: Changes of each commit indexed by the commit sha.
+    """
+
+    version: str = ""
+    commits: Dict[str, List[Change]] = Field(default_factory=dict)
+
+
+class ManifestEntry(BaseModel):
+    """Represent a newsletter article of the manifest.
+
+    Attributes:
+        type_: Type of the newsletter.
+        date: Start of the period of the newsletter.
+        title: Human readable name of the period of the newsletter.
+        digest: sha256 hex digest of the content generated for the article, None if
+            it was not generated by the plugin.
+    """
+
+    type_: str
+    date: datetime
+    title: str
+    digest: Optional[str] = None
+
+
+class NavCache(BaseModel):
+    """Represent the nav tree built from the newsletter articles.
+
+    Attributes:
+        levels: Newsletter types of the levels of the tree.
+        articles: Paths of the articles added to the tree.
+        tree: Nested sections of the nav, each with a title, the path of its
+            article if there is one, and its children sections indexed by their
+            level, sorted descending.
+    """
+
+    levels: List[str] = Field(default_factory=list)
+    articles: List[str] = Field(default_factory=list)
+    tree: Dict[str, Any] = Field(default_factory=dict)
+
+
+class NewsletterManifest(BaseModel):
+    """Index the newsletter articles of the newsletter directory.
+
+    Attributes:
+        articles: Articles indexed by their path relative to the newsletter
+            directory.
+        directories: Modification time in nanoseconds of each subdirectory of the
+            newsletter directory, indexed by its relative path.
+        compacted: Articles removed by the retention policy, indexed by the path
+            they had when they were removed.
+        moved: Path of the articles moved by a layout change, indexed by the path
+            they had before it.
+        archived: Path of the archive page that holds the content of the compacted
+            articles that no longer period article contains, indexed by the path
+            they had when they were removed.
+        nav: Nav tree of the articles of the last build.
+    """
+
+    articles: Dict[str, ManifestEntry] = Field(default_factory=dict)
+    directories: Dict[str, int] = Field(default_factory=dict)
+    compacted: Dict[str, ManifestEntry] = Field(default_factory=dict)
+    moved: Dict[str, str] = Field(default_factory=dict)
+    archived: Dict[str, str] = Field(default_factory=dict)
+    nav: NavCache = Field(default_factory=NavCache)
+
+    def newsletters(self, newsletter_dir: str) -> Newsletters:
+        """Return the newsletters of the manifest without parsing their file names.
+
+        Args:
+            newsletter_dir: Directory containing the newsletter articles.
+        """
+        newsletters = Newsletters()
+        for file_path, entry in self.articles.items():
+            getattr(newsletters, entry.type_).append(
+                Newsletter.from_name(
+                    Path(newsletter_dir) / file_path, entry.type_, entry.date
+                )
+            )
+        newsletters.sort()
+        return newsletters
+
+
 class NewsletterSection(BaseModel):
     """Represent the section of a newsletter article.
 
@@ -251,6 +649,49 @@ class Feed(BaseModel):
     entries: List[FeedEntry] = Field(default_factory=list)
 
 
+class FeedEntriesCache(BaseModel):
+    """Store the RSS entries extracted from the built newsletter pages.
+
+    Attributes:
+        version: Version of the plugin that extracted the entries.
+        entries: Entries indexed by the digest of their page, link and author.
+    """
+
+    version: str = ""
+    entries: Dict[str, FeedEntry] = Field(default_factory=dict)
+    _used: Set[str] = PrivateAttr(default_factory=set)
+
+    def get(self, key: str) -> Optional[FeedEntry]:
+        """Return the entry of a key, marking it as used.
+
+        Args:
+            key: Key of the entry.
+        """
+        self._used.add(key)
+        return self.entries.get(key)
+
+    def add(self, key: str, entry: FeedEntry) -> None:
+        """Store the entry of a key, marking it as used.
+
+        Args:
+            key: Key of the entry.
+            entry: Entry extracted from the page.
+        """
+        self._used.add(key)
+        self.entries[key] = entry
+
+    def prune(self) -> bool:
+        """Remove the entries that were not used.
+
+        Returns:
+            Whether any entry was removed.
+        """
+        unused = set(self.entries) - self._used
+        for key in unused:
+            del self.entries[key]
+        return bool(unused)
+
+
 Newsletter.update_forward_refs()
 NewsletterSection.update_forward_refs()
 FeedEntry.update_forward_refs()
@@ -5,14 +5,18 @@ and handlers to achieve the program's purpose.
 """
 
 import datetime
+import os
 import re
 from contextlib import suppress
 from typing import List, Optional, Tuple
 
 from dateutil import tz
 from git import Commit, Repo
+from pydantic import ValidationError
 
-from ..model import Change
+from ..adapters.files import FileBatch
+from ..model import Change, ChangesCache
+from ..version import __version__
 
 TYPES = {
     "feat": "feature",
@@ -29,12 +33,17 @@ TYPES = {
 
 
 def semantic_changes(
-    repo: Repo, min_date: Optional[datetime.datetime] = None
+    repo: Repo,
+    min_date: Optional[datetime.datetime] = None,
+    cache_dir: Optional[str] = None,
 ) -> List[Change]:
     """Extract meaningful changes from a git repository.
 
     Args:
         repo: Git repository to analyze.
+        min_date: Ignore the commits authored before this date.
+        cache_dir: Directory to store the changes parsed from each commit, so they're
+            not parsed again in the next builds.
 
     Returns:
         changes: List of Change objects.
@@ -49,7 +58,47 @@ def semantic_changes(
         if commit.authored_datetime < now and commit.authored_datetime > min_date
     ]
 
-    return commits_to_changes(commits)
+    if cache_dir is None:
+        return commits_to_changes(commits)
+    return _cached_commits_to_changes(commits, cache_dir)
+
+
+def _cached_commits_to_changes(commits: List[Commit], cache_dir: str) -> List[Change]:
+    """Extract the semantic changes from a list of commits using the cache.
+
+    The cache is discarded when it was created by another version of the plugin,
+    as the parsing of the commits may have changed.
+
+    Args:
+        commits: List of commits to parse.
+        cache_dir: Directory that holds the cache.
+
+    Returns:
+        changes: List of semantic changes.
+    """
+    cache_path = os.path.join(cache_dir, "changes.json")
+    cache = ChangesCache(version=__version__)
+    with suppress(FileNotFoundError, ValidationError):
+        stored_cache = ChangesCache.parse_file(cache_path)
+        if stored_cache.version == __version__:
+            cache = stored_cache
+
+    changes = []
+    updated = False
+    for commit in commits:
+        try:
+            changes += cache.commits[commit.hexsha]
+        except KeyError:
+            commit_changes = commits_to_changes([commit])
+            cache.commits[commit.hexsha] = commit_changes
+            changes += commit_changes
+            updated = True
+
+    if updated:
+        os.makedirs(cache_dir, exist_ok=True)
+        with FileBatch() as batch:
+            batch.write(cache_path, cache.json())
+    return changes
 
 
 def commits_to_changes(commits: List[Commit]) -> List[Change]:
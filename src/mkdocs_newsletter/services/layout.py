@@ -0,0 +1,348 @@
+"""Gather services to organize the newsletter articles in the directory."""
+
+import datetime
+import hashlib
+import os
+import posixpath
+import re
+from contextlib import suppress
+from typing import Dict, List, Optional, Set
+
+from dateutil import tz
+from mkdocs.config.defaults import MkDocsConfig
+
+from ..adapters.files import FileBatch
+from ..adapters.html import ARTICLE_BEGIN, ARTICLE_END
+from ..adapters.templates import get_template
+from ..model import (
+    PERIODS,
+    ManifestEntry,
+    NewsletterLayout,
+    NewsletterManifest,
+    NewsletterType,
+    PeriodSpan,
+)
+from .manifest import save_manifest
+
+
+def migrate_layout(
+    newsletter_dir: str, layout: NewsletterLayout, manifest: NewsletterManifest
+) -> int:
+    """Move the newsletter articles to the paths of the layout.
+
+    The subdirectories left empty are removed, and the manifest is updated with the
+    new paths. The old paths are recorded in the manifest, so their URLs can be
+    redirected to the new ones.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        layout: Layout of the newsletter directory.
+        manifest: Snapshot of the newsletter directory of the build.
+
+    Returns:
+        Number of articles moved.
+    """
+    moved = 0
+    for file_path in list(manifest.articles):
+        basename = posixpath.splitext(posixpath.basename(file_path))[0]
+        layout_path = layout.file_path(basename)
+        if layout_path == file_path:
+            continue
+        entry = manifest.articles.pop(file_path)
+        target_path = os.path.join(newsletter_dir, layout_path)
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        try:
+            os.replace(os.path.join(newsletter_dir, file_path), target_path)
+        except FileNotFoundError:
+            continue
+        manifest.articles[layout_path] = entry
+        _record_move(manifest, file_path, layout_path)
+        moved += 1
+
+    if moved:
+        _remove_empty_directories(newsletter_dir)
+        save_manifest(newsletter_dir, manifest)
+    return moved
+
+
+def _remove_empty_directories(newsletter_dir: str) -> None:
+    """Remove the subdirectories of the newsletter directory left empty."""
+    for directory, subdirectories, files in os.walk(newsletter_dir, topdown=False):
+        if directory != newsletter_dir and not subdirectories and not files:
+            os.rmdir(directory)
+
+
+def _record_move(manifest: NewsletterManifest, old_path: str, new_path: str) -> None:
+    """Record that an article was moved to another path.
+
+    The paths the article had before the previous moves point to the new one too,
+    and the new path is no longer an old one if the article is moved back to it.
+
+    Args:
+        manifest: Snapshot of the newsletter directory of the build.
+        old_path: Path of the article before the move.
+        new_path: Path of the article after the move.
+    """
+    for path, target in manifest.moved.items():
+        if target == old_path:
+            manifest.moved[path] = new_path
+    manifest.moved[old_path] = new_path
+    manifest.moved.pop(new_path, None)
+
+
+def compact_newsletters(
+    newsletter_dir: str, manifest: NewsletterManifest, retention_days: int
+) -> int:
+    """Remove the daily and weekly articles older than the retention period.
+
+    The articles whose changes are already summarized in the monthly, quarterly or
+    yearly articles are removed, so the site has a bounded number of short period
+    pages. The content of the rest, like the ones whose monthly article is not
+    published yet or the ones of sites without the longer feeds, is moved to an
+    archive page per month first, so it's never lost.
+
+    The removed articles are recorded in the manifest, so they're not created
+    again and their URLs are redirected. The articles edited by hand are kept.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        manifest: Snapshot of the newsletter directory of the build.
+        retention_days: Days that an article is kept after its period ends.
+
+    Returns:
+        Number of articles removed.
+    """
+    cutoff = datetime.datetime.now(tz.tzlocal()).date() - datetime.timedelta(
+        days=retention_days
+    )
+    basenames = {
+        posixpath.splitext(posixpath.basename(file_path))[0]
+        for file_path in manifest.articles
+    }
+    archives: Dict[PeriodSpan, List[str]] = {}
+    compacted = []
+    for file_path, entry in sorted(
+        manifest.articles.items(), key=lambda item: item[1].date
+    ):
+        if entry.type_ not in ("daily", "weekly") or entry.digest is None:
+            continue
+        span = PERIODS[NewsletterType(entry.type_)].span(entry.date)
+        if span.end > cutoff:
+            continue
+        try:
+            with open(os.path.join(newsletter_dir, file_path), "rb") as article_file:
+                article: Optional[bytes] = article_file.read()
+        except FileNotFoundError:
+            article = None
+        month = PERIODS[NewsletterType.MONTHLY].span(entry.date)
+        if article is not None:
+            if hashlib.sha256(article).hexdigest() != entry.digest:
+                continue
+            if not _is_covered(span, basenames):
+                archives.setdefault(month, []).append(
+                    _archive_section(entry, article.decode("utf-8"))
+                )
+                manifest.archived[file_path] = _compacted_archive_file(month)
+        elif _is_archived(newsletter_dir, entry, month):
+            # A compaction was interrupted after the article was archived and removed
+            manifest.archived[file_path] = _compacted_archive_file(month)
+        compacted.append(file_path)
+
+    _write_compacted_archives(newsletter_dir, archives)
+    for file_path in compacted:
+        with suppress(FileNotFoundError):
+            os.remove(os.path.join(newsletter_dir, file_path))
+        manifest.compacted[file_path] = manifest.articles.pop(file_path)
+
+    if compacted:
+        _remove_empty_directories(newsletter_dir)
+        save_manifest(newsletter_dir, manifest)
+    return len(compacted)
+
+
+def _is_covered(span: PeriodSpan, basenames: Set[str]) -> bool:
+    """Check if every day of a period is in a monthly, quarterly or yearly article.
+
+    Args:
+        span: Period of the article.
+        basenames: Basenames of the existing articles.
+    """
+    day = span.start
+    while day < span.end:
+        if not any(
+            PERIODS[type_].key(day) in basenames
+            for type_ in (
+                NewsletterType.MONTHLY,
+                NewsletterType.QUARTERLY,
+                NewsletterType.YEARLY,
+            )
+        ):
+            return False
+        day += datetime.timedelta(days=1)
+    return True
+
+
+def _compacted_archive_file(month: PeriodSpan) -> str:
+    """Return the file name of the archive page of the articles of a month."""
+    return f"0_compacted_{month.key}.md"
+
+
+def _section_heading(entry: ManifestEntry) -> str:
+    """Return the heading of the section of an article in its archive page.
+
+    The headings of the article content are nested under it, so it identifies the
+    section in the page.
+    """
+    return f"## {entry.title}\n"
+
+
+def _is_archived(newsletter_dir: str, entry: ManifestEntry, month: PeriodSpan) -> bool:
+    """Check if the archive page of a month has the section of an article.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        entry: Manifest entry of the article.
+        month: Month of the archive page.
+    """
+    try:
+        with open(
+            os.path.join(newsletter_dir, _compacted_archive_file(month)),
+            "r",
+            encoding="utf-8",
+        ) as archive:
+            return f"\n{_section_heading(entry)}" in archive.read()
+    except FileNotFoundError:
+        return False
+
+
+def _archive_section(entry: ManifestEntry, article: str) -> str:
+    """Convert the content of an article into a section of an archive page.
+
+    The headings of the article are nested under its title, and the article markers
+    are removed.
+
+    Args:
+        entry: Manifest entry of the article.
+        article: Markdown of the article.
+    """
+    content = re.sub(r"^#", "###", article, flags=re.MULTILINE)
+    for marker in (ARTICLE_BEGIN, ARTICLE_END):
+        content = content.replace(marker, "")
+    return f"{_section_heading(entry)}\n{content.strip()}\n"
+
+
+def _write_compacted_archives(
+    newsletter_dir: str, archives: Dict[PeriodSpan, List[str]]
+) -> None:
+    """Add the sections of the compacted articles to their archive pages.
+
+    The sections that are already in the page, because a previous compaction was
+    interrupted before it saved the manifest, are not added again.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        archives: Sections to add indexed by the month of the archive page.
+    """
+    with FileBatch() as batch:
+        for month, sections in archives.items():
+            archive_path = os.path.join(newsletter_dir, _compacted_archive_file(month))
+            try:
+                with open(archive_path, "r", encoding="utf-8") as archive:
+                    content = archive.read()
+            except FileNotFoundError:
+                content = f"# Archive of {month.title}\n"
+            new_sections = [
+                section
+                for section in sections
+                if "\n" + section.splitlines()[0] + "\n" not in content
+            ]
+            if new_sections:
+                batch.write(archive_path, "\n".join([content, *new_sections]))
+
+
+def create_redirects(
+    config: MkDocsConfig,
+    working_dir: str,
+    manifest: NewsletterManifest,
+    fsync: bool = False,
+) -> None:
+    """Redirect the URLs of the articles that are no longer published there.
+
+    The URLs the articles had before a layout change redirect to their new URL, and
+    the URLs of the compacted articles redirect to the article of the shortest
+    period that contains them. The articles published before the layout was
+    changed or they were compacted keep working for the readers and the RSS clients
+    that stored their old URL.
+
+    The redirect pages are only written if their content changed.
+
+    Args:
+        config: MkDocs configuration object.
+        working_dir: MkDocs root directory.
+        manifest: Snapshot of the newsletter directory of the build.
+        fsync: Flush the redirect pages to disk before replacing the old ones.
+    """
+    template = get_template("redirect.html.j2")
+    site_newsletter_dir = os.path.join(
+        working_dir, config.get("site_dir", "site"), "newsletter"
+    )
+    with FileBatch(fsync) as batch:
+        for url_path, target in _redirect_targets(manifest).items():
+            redirect_path = os.path.join(site_newsletter_dir, url_path, "index.html")
+            os.makedirs(os.path.dirname(redirect_path), exist_ok=True)
+            batch.write_if_changed(
+                redirect_path,
+                template.render(url=f"{posixpath.relpath(target, url_path)}/"),
+            )
+
+
+def _redirect_targets(manifest: NewsletterManifest) -> Dict[str, str]:
+    """Return the URL that each old article URL redirects to.
+
+    Args:
+        manifest: Snapshot of the newsletter directory of the build.
+
+    Returns:
+        The target URL paths indexed by the old URL paths, both relative to the
+            newsletter directory.
+    """
+    article_urls: Dict[str, str] = {}
+    for file_path in manifest.articles:
+        url_path = posixpath.splitext(file_path)[0]
+        article_urls[posixpath.basename(url_path)] = url_path
+    targets = {
+        file_path: posixpath.splitext(manifest.archived[file_path])[0]
+        if file_path in manifest.archived
+        else _covering_article_url(entry, article_urls)
+        for file_path, entry in manifest.compacted.items()
+    }
+    for old_path, new_path in manifest.moved.items():
+        if new_path in manifest.articles:
+            targets[old_path] = posixpath.splitext(new_path)[0]
+        elif new_path in manifest.compacted:
+            targets[old_path] = targets[new_path]
+    return {
+        posixpath.splitext(file_path)[0]: target
+        for file_path, target in targets.items()
+    }
+
+
+def _covering_article_url(entry: ManifestEntry, article_urls: Dict[str, str]) -> str:
+    """Return the URL of the article of the shortest period that contains an entry.
+
+    Args:
+        entry: Manifest entry of the compacted article.
+        article_urls: URL paths of the existing articles, indexed by their basename.
+
+    Returns:
+        The URL path relative to the newsletter directory, the landing page if no
+            article contains the entry.
+    """
+    for type_ in (
+        NewsletterType.MONTHLY,
+        NewsletterType.QUARTERLY,
+        NewsletterType.YEARLY,
+    ):
+        with suppress(KeyError):
+            return article_urls[PERIODS[type_].key(entry.date)]
+    return "0_newsletter_index"
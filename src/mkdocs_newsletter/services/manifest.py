@@ -0,0 +1,174 @@
+"""Gather services to keep the manifest of the newsletter articles."""
+
+import os
+import posixpath
+from contextlib import suppress
+from pathlib import Path
+from typing import Optional
+
+from pydantic import ValidationError
+
+from ..adapters.files import FileBatch
+from ..model import (
+    PERIODS,
+    ManifestEntry,
+    Newsletter,
+    NewsletterManifest,
+    NewsletterType,
+)
+
+
+def load_manifest(newsletter_dir: str) -> NewsletterManifest:
+    """Load the manifest of the newsletter articles.
+
+    The manifest is only trusted if the directory and its subdirectories didn't
+    change since it was saved, otherwise the directory is scanned again, keeping the
+    digests of the articles that were already in the manifest.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+
+    Returns:
+        The manifest of the articles of the directory.
+    """
+    if not os.path.isdir(newsletter_dir):
+        return NewsletterManifest()
+    manifest = NewsletterManifest()
+    with suppress(FileNotFoundError, ValidationError):
+        manifest = NewsletterManifest.parse_file(_manifest_path(newsletter_dir))
+        if manifest_is_fresh(newsletter_dir, manifest):
+            return manifest
+    return _scan_newsletter_dir(newsletter_dir, manifest)
+
+
+def manifest_is_fresh(newsletter_dir: str, manifest: NewsletterManifest) -> bool:
+    """Check if the manifest was saved after the last change of the directory.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        manifest: Manifest stored in the directory.
+    """
+    try:
+        if (
+            os.stat(_manifest_path(newsletter_dir)).st_mtime_ns
+            != os.stat(newsletter_dir).st_mtime_ns
+        ):
+            return False
+        return all(
+            os.stat(os.path.join(newsletter_dir, directory)).st_mtime_ns == mtime
+            for directory, mtime in manifest.directories.items()
+        )
+    except FileNotFoundError:
+        return False
+
+
+def _scan_newsletter_dir(
+    newsletter_dir: str, manifest: NewsletterManifest
+) -> NewsletterManifest:
+    """Build the manifest of the articles of the newsletter directory.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        manifest: Outdated manifest of the directory.
+
+    Returns:
+        Manifest with the articles of the directory and its subdirectories.
+    """
+    scanned_manifest = NewsletterManifest(
+        compacted=manifest.compacted,
+        moved=manifest.moved,
+        archived=manifest.archived,
+        nav=manifest.nav,
+    )
+    directories = [""]
+    while directories:
+        directory = directories.pop()
+        with os.scandir(os.path.join(newsletter_dir, directory)) as files:
+            for file_ in files:
+                # Skip the landing page, the manifest and the temporary files
+                if file_.name == "0_newsletter_index.md" or file_.name.startswith("."):
+                    continue
+                file_path = posixpath.join(directory, file_.name)
+                if file_.is_dir():
+                    directories.append(file_path)
+                    continue
+                entry = manifest.articles.get(file_path)
+                if entry is None:
+                    with suppress(ValueError):
+                        entry = manifest_entry(file_path)
+                if entry is not None:
+                    scanned_manifest.articles[file_path] = entry
+    return scanned_manifest
+
+
+def manifest_entry(file_path: str, digest: Optional[str] = None) -> ManifestEntry:
+    """Create the manifest entry of a newsletter article.
+
+    Args:
+        file_path: Path of the article relative to the newsletter directory.
+        digest: Digest of the content generated for the article.
+
+    Raises:
+        ValueError: If the file name is not a newsletter one.
+    """
+    newsletter = Newsletter(file_=Path(file_path))
+    type_ = newsletter.type_
+    return ManifestEntry(
+        type_=type_,
+        date=newsletter.date,
+        title=PERIODS[NewsletterType(type_)].span(newsletter.date).title,
+        digest=digest,
+    )
+
+
+def save_manifest(newsletter_dir: str, manifest: NewsletterManifest) -> None:
+    """Save the manifest if it changed and mark it as up to date with the directory.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        manifest: Manifest of the articles of the directory.
+    """
+    directories = set()
+    for file_path in manifest.articles:
+        directory = posixpath.dirname(file_path)
+        while directory:
+            directories.add(directory)
+            directory = posixpath.dirname(directory)
+    manifest.directories = {}
+    for directory in sorted(directories):
+        with suppress(FileNotFoundError):
+            manifest.directories[directory] = os.stat(
+                os.path.join(newsletter_dir, directory)
+            ).st_mtime_ns
+
+    with FileBatch() as batch:
+        batch.write_if_changed(_manifest_path(newsletter_dir), manifest.json(indent=2))
+    _stamp_manifest(newsletter_dir)
+
+
+def _stamp_manifest(newsletter_dir: str) -> None:
+    """Mark the manifest as up to date with the newsletter directory.
+
+    The manifest gets the modification time of the directory, which changes each
+    time a file is added, removed or renamed in it. It's not touched if it already
+    has it, so the file watchers are not triggered.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+    """
+    with suppress(FileNotFoundError):
+        manifest_path = _manifest_path(newsletter_dir)
+        directory_stat = os.stat(newsletter_dir)
+        if os.stat(manifest_path).st_mtime_ns != directory_stat.st_mtime_ns:
+            os.utime(
+                manifest_path,
+                ns=(directory_stat.st_atime_ns, directory_stat.st_mtime_ns),
+            )
+
+
+def _manifest_path(newsletter_dir: str) -> str:
+    """Return the path of the manifest of the newsletter articles.
+
+    The name starts with a dot so that MkDocs doesn't publish it.
+    """
+    return os.path.join(newsletter_dir, ".manifest.json")
@@ -1,74 +1,263 @@
 """Gather services to create the newsletters MkDocs nav section."""
 
-import calendar
-import datetime
 import os
 import re
-from typing import Any, Dict, List, Tuple, Union
+from contextlib import suppress
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from mkdocs.config.defaults import MkDocsConfig
 
-NavData = Dict[Union[int, str], Any]
+from ..adapters.files import FileBatch
+from ..adapters.templates import get_template
+from ..model import (
+    DEFAULT_FEEDS,
+    PERIODS,
+    NewsletterManifest,
+    NewsletterOptions,
+    Newsletters,
+    Period,
+)
+from .manifest import load_manifest, manifest_is_fresh, save_manifest
+from .newsletter import _list_newsletters, article_path, get_periods
+
+NavData = Dict[str, Any]
 Sections = List[Union[str, Dict[str, Any]]]
 
 
-def build_nav(config: MkDocsConfig, newsletter_dir: str) -> MkDocsConfig:
+def build_nav(
+    config: MkDocsConfig,
+    newsletter_dir: str,
+    options: Optional[NewsletterOptions] = None,
+    manifest: Optional[NewsletterManifest] = None,
+) -> MkDocsConfig:
     """Build the navigation section of the newsletters.
 
+    The nav tree of the previous build is stored in the manifest, and only the new
+    articles are added to it. It's built again from scratch if an article was
+    removed or the enabled feeds changed.
+
+    If the nav window is set, only the newsletters of the most recent years are added to
+    the nav. Each older year is added as a single archive page that lists its
+    newsletters.
+
     Args:
         config: MkDocs configuration object.
         newsletter_dir: Directory containing the newsletter articles.
+        options: Options of the build, with the enabled feeds and the nav window.
+        manifest: Snapshot of the newsletter directory of the build.
 
     Returns:
         The config object with the newsletters.
     """
-    nav_data: Dict[Union[int, str], Any] = {}
+    if options is None:
+        options = NewsletterOptions()
+    levels = _nav_levels(options.periods)
+    if manifest is None:
+        manifest = load_manifest(newsletter_dir)
+    # Only a manifest that matches the directory can be stored again
+    fresh = manifest_is_fresh(newsletter_dir, manifest)
+    nav_changed = _update_nav_cache(manifest, levels)
+    nav_data: NavData = dict(manifest.nav.tree)
 
-    newsletter_regex = (
-        r"(?P<year>\d{4})"
-        r"(_w(?P<week_number>\d{2}))?"
-        r"(_(?P<month>\d{2}))?"
-        r"(_(?P<day>\d{2}))?.md"
+    if os.path.isfile(os.path.join(newsletter_dir, "0_newsletter_index.md")):
+        nav_data["index"] = "newsletter/0_newsletter_index.md"
+
+    archive: Sections = []
+    archived_years: List[int] = []
+    if options.nav_window > 0:
+        years = [int(key) for key in nav_data if key.isdigit()]
+        archived_years = years[options.nav_window :]
+        for year in archived_years:
+            title = nav_data.pop(str(year))["title"]
+            archive.append({title: f"newsletter/{_archive_file(year)}"})
+    newsletters = (
+        _list_newsletters(newsletter_dir, manifest) if archived_years else Newsletters()
+    )
+    archive_changed = _write_archive_pages(
+        newsletter_dir, archived_years, newsletters, levels, options.fsync
     )
-    for file_ in os.scandir(newsletter_dir):
-        file_path = f"newsletter/{file_.name}"
-        match = re.match(newsletter_regex, file_.name)
-        if match is None:
-            if file_.name == "0_newsletter_index.md":
-                nav_data["index"] = file_path
+    if fresh and (nav_changed or archive_changed):
+        # The archive pages are not articles, so the snapshot is still up to date
+        save_manifest(newsletter_dir, manifest)
+
+    return _nav_data_to_nav(nav_data, config, len(levels), archive)
+
+
+def _update_nav_cache(manifest: NewsletterManifest, levels: List[Period]) -> bool:
+    """Add the new articles of the manifest to its nav tree.
+
+    Args:
+        manifest: Snapshot of the newsletter directory of the build.
+        levels: Periods that form the levels of the nav.
+
+    Returns:
+        Whether the nav tree changed.
+    """
+    nav = manifest.nav
+    level_types = [level.type_.value for level in levels]
+    cached_articles = set(nav.articles)
+    new_articles = [
+        file_path for file_path in manifest.articles if file_path not in cached_articles
+    ]
+    if nav.levels != level_types or len(cached_articles) + len(new_articles) != len(
+        manifest.articles
+    ):
+        # Some article was removed, or the levels changed, so the tree is rebuilt
+        nav.levels = level_types
+        nav.articles = []
+        nav.tree = {}
+        new_articles = list(manifest.articles)
+
+    for file_path in new_articles:
+        entry = manifest.articles[file_path]
+        nav.articles.append(file_path)
+        if entry.type_ not in level_types:
             continue
+        section_data = nav.tree
+        for parent_level in levels[: level_types.index(entry.type_) + 1]:
+            span = parent_level.span(entry.date)
+            section_data = _child_section(section_data, str(span.level), span.title)
+        section_data["index"] = f"newsletter/{file_path}"
+    return bool(new_articles)
+
+
+def _child_section(section_data: NavData, key: str, title: str) -> NavData:
+    """Return the child section of a level, creating it in its sorted position.
+
+    The children are kept sorted descending by their level, so the nav is built
+    without sorting them.
+
+    Args:
+        section_data: Dictionary with the data of the section.
+        key: Level of the child section.
+        title: Title of the child section, if it needs to be created.
+
+    Returns:
+        The data of the child section.
+    """
+    with suppress(KeyError):
+        return section_data[key]
+    child: NavData = {"title": title}
+    children = list(section_data.items())
+    section_data.clear()
+    for child_key, child_data in children:
+        if (
+            key not in section_data
+            and child_key.isdigit()
+            and int(child_key) < int(key)
+        ):
+            section_data[key] = child
+        section_data[child_key] = child_data
+    section_data.setdefault(key, child)
+    return child
+
+
+def _archive_file(year: int) -> str:
+    """Return the file name of the archive page of a year."""
+    return f"0_archive_{year}.md"
+
+
+def _write_archive_pages(
+    newsletter_dir: str,
+    years: List[int],
+    newsletters: Newsletters,
+    levels: List[Period],
+    fsync: bool = False,
+) -> bool:
+    """Write the archive pages of the years and remove the ones of other years.
+
+    The pages are only written if their content changed, so the file watchers are
+    not triggered on each build.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        years: Years that are collapsed into an archive page.
+        newsletters: Existing newsletters.
+        levels: Periods that form the levels of the nav.
+        fsync: Flush the pages to disk before replacing the old ones.
+
+    Returns:
+        Whether any archive page was written or removed.
+    """
+    changed = False
+    archive_files = {_archive_file(year) for year in years}
+    with os.scandir(newsletter_dir) as files:
+        for file_ in files:
+            if (
+                re.match(r"0_archive_\d{4}\.md$", file_.name)
+                and file_.name not in archive_files
+            ):
+                os.remove(file_.path)
+                changed = True
+
+    template = get_template("newsletter_archive.j2")
+    with FileBatch(fsync) as batch:
+        for year in years:
+            content = template.render(
+                year=year,
+                feeds=_archive_feeds(newsletter_dir, year, newsletters, levels),
+            )
+            if batch.write_if_changed(
+                os.path.join(newsletter_dir, _archive_file(year)), content
+            ):
+                changed = True
+    return changed
 
-        year_match = match.group("year")
-        week_match = match.group("week_number")
-        month_match = match.group("month")
-        day_match = match.group("day")
-
-        if year_match is not None:
-            year = int(year_match)
-            nav_data.setdefault(year, {})
-            if month_match is not None:
-                month = int(month_match)
-                nav_data[year].setdefault(month, {})
-                if day_match is not None:
-                    day = int(day_match)
-                    week = datetime.datetime(year, month, day).isocalendar()[1]
-                    nav_data[year][month].setdefault(week, {})
-                    nav_data[year][month][week][day] = file_path
-                else:
-                    nav_data[year][month]["index"] = file_path
-            elif week_match is not None:
-                week = int(week_match)
-                month = datetime.datetime.strptime(f"{year}{week}-1", "%Y%W-%w").month
-                nav_data[year].setdefault(month, {})
-                nav_data[year][month].setdefault(week, {})
-                nav_data[year][month][week]["index"] = file_path
-            else:
-                nav_data[year]["index"] = file_path
-
-    return _nav_data_to_nav(nav_data, config)
-
-
-def _nav_data_to_nav(nav_data: NavData, config: MkDocsConfig) -> MkDocsConfig:
+
+def _archive_feeds(
+    newsletter_dir: str, year: int, newsletters: Newsletters, levels: List[Period]
+) -> List[Tuple[str, List[Tuple[str, str]]]]:
+    """Return the newsletters of a year grouped by feed for its archive page.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        year: Year of the archive page.
+        newsletters: Existing newsletters.
+        levels: Periods that form the levels of the nav.
+
+    Returns:
+        The title and path of the articles of each feed that has any.
+    """
+    feeds = []
+    for level in levels:
+        articles = [
+            (
+                level.span(newsletter.date).title,
+                article_path(newsletter, newsletter_dir),
+            )
+            for newsletter in getattr(newsletters, level.type_.value)
+            if newsletter.date.year == year
+        ]
+        if articles:
+            feeds.append((level.type_.value, articles))
+    return feeds
+
+
+def _nav_levels(periods: Optional[List[Period]] = None) -> List[Period]:
+    """Return the periods that form the levels of the nav.
+
+    The default feeds are always part of the hierarchy, even if they are disabled, so
+    the nav doesn't change its structure when a feed is dropped. The rest are only
+    added when they're enabled.
+
+    Args:
+        periods: Periods of the enabled feeds.
+    """
+    if periods is None:
+        periods = get_periods()
+    return [
+        period
+        for period in PERIODS.values()
+        if period.type_.value in DEFAULT_FEEDS or period in periods
+    ]
+
+
+def _nav_data_to_nav(
+    nav_data: NavData,
+    config: MkDocsConfig,
+    depth: int,
+    archive: Optional[Sections] = None,
+) -> MkDocsConfig:
     """Convert the nav_data dictionary to the Mkdocs nav section.
 
     Args:
@@ -76,78 +265,77 @@ def _nav_data_to_nav(nav_data: NavData, config: MkDocsConfig) -> MkDocsConfig:
             {
                 'index': 0_newsletter_index.md
                 year: {
+                    'title': year
                     'index': year.md
                     month_number: {
+                        'title': month_name of year
                         'index': year_month.md
                         week_number: {
+                            'title': week_number Week of year
                             'index': year_wweek_number.md
-                            day: year_month_day.md
+                            day: {
+                                'title': day month_name year
+                                'index': year_month_day.md
+                            }
                         }
                     }
                 }
             }
         config: MkDocs configuration object.
+        depth: Number of levels of the nav.
+        archive: Pages of the archived years, added after the other sections.
 
     Returns:
         MkDocs config object with the list of newsletters under the Newsletters section.
     """
-    newsletter_nav, nav_data = _initialize_section(nav_data)
-
-    for year, year_data in sorted(nav_data.items(), reverse=True):
-        year_nav, year_data = _initialize_section(year_data)
-
-        for month, month_data in sorted(year_data.items(), reverse=True):
-            month_nav, month_data = _initialize_section(month_data)
-
-            for week, week_data in sorted(month_data.items(), reverse=True):
-                week_nav, week_data = _initialize_section(week_data)
-
-                for day, day_data in sorted(week_data.items(), reverse=True):
-                    day_title = (
-                        f"{_int_to_ordinal(day)} {calendar.month_name[month]} {year}"
-                    )
-                    week_nav.append({day_title: day_data})
-                month_nav.append({f"{_int_to_ordinal(week)} Week of {year}": week_nav})
-            year_nav.append({f"{calendar.month_name[month]} of {year}": month_nav})
-        newsletter_nav.append({str(year): year_nav})
+    newsletter_nav = _initialize_section(nav_data)
+    newsletter_nav.extend(_build_sections(nav_data, depth))
+    newsletter_nav.extend(archive or [])
     config["nav"].append({"Newsletters": newsletter_nav})
 
     return config
 
 
-def _initialize_section(section_data: NavData) -> Tuple[Sections, NavData]:
-    """Create the section object with the section data.
+def _build_sections(nav_data: NavData, depth: int) -> Sections:
+    """Convert the children of a nav_data section into nav sections.
 
-    If the section_data contains an 'index' key it will index the section page,
-    otherwise it will create an empty list.
+    The children are already sorted descending, and the sections of the deepest
+    level are added as pages instead of sections.
 
     Args:
-        section_data: Dictionary with the section data
-        config: MkDocs config object.
+        nav_data: Dictionary with the data of the children sections.
+        depth: Number of levels left below the section.
 
     Returns:
         List of sections.
-        Updated section_data without the 'index' key.
     """
-    try:
-        section_nav = [section_data["index"]]
-        section_data.pop("index")
-    except KeyError:
-        section_nav = []
+    sections: Sections = []
+    for key, section_data in nav_data.items():
+        if key in ("title", "index"):
+            continue
+        title = section_data["title"]
+        if depth == 1:
+            sections.append({title: section_data["index"]})
+            continue
+        section_nav = _initialize_section(section_data)
+        section_nav.extend(_build_sections(section_data, depth - 1))
+        sections.append({title: section_nav})
+    return sections
 
-    return section_nav, section_data
 
+def _initialize_section(section_data: NavData) -> Sections:
+    """Create the section object with the section data.
 
-def _int_to_ordinal(number: int) -> str:
-    """Convert an integer into its ordinal representation.
+    If the section_data contains an 'index' key it will index the section page,
+    otherwise it will create an empty list.
 
     Args:
-        number: Number to convert
+        section_data: Dictionary with the section data
 
     Returns:
-        ordinal representation of the number
+        List of sections.
     """
-    suffix = ["th", "st", "nd", "rd", "th"][min(number % 10, 4)]
-    if 11 <= (number % 100) <= 13:
-        suffix = "th"
-    return f"{number}{suffix}"
+    try:
+        return [section_data["index"]]
+    except KeyError:
+        return []
@@ -1,29 +1,57 @@
 """Gather services related to the management of the newsletters."""
 
 import datetime
-import itertools
+import heapq
+import logging
 import operator
 import os
+import posixpath
 import re
+import time
 from contextlib import suppress
+from functools import partial
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 from dateutil import tz
-from dateutil.relativedelta import relativedelta
 from deepdiff import grep
 from git import Repo
-from jinja2 import Environment, PackageLoader, select_autoescape
 from mkdocs.config.defaults import MkDocsConfig
 
+from ..adapters.files import FileBatch, FileWrite, write_if_changed
+from ..adapters.html import ARTICLE_BEGIN, ARTICLE_END
+from ..adapters.pool import run_pool
+from ..adapters.templates import configure_templates, get_template
 from ..model import (
+    DEFAULT_FEEDS,
+    PERIODS,
+    BuildStats,
     Change,
     DigitalGardenChanges,
     LastNewsletter,
+    ManifestEntry,
     Newsletter,
+    NewsletterManifest,
+    NewsletterOptions,
     Newsletters,
     NewsletterSection,
+    NewsletterType,
+    Period,
+    PeriodSpan,
+    calendar_day,
 )
+from .manifest import load_manifest, manifest_entry, save_manifest
+
+log = logging.getLogger(f"mkdocs.plugins.{__name__}")
 
 CHANGE_TYPE_TEXT = {
     "feature": "New",
@@ -33,69 +61,82 @@ CHANGE_TYPE_TEXT = {
 }
 
 
-def last_newsletter_changes(newsletter_dir: str) -> LastNewsletter:
+def get_periods(feeds: Optional[List[str]] = None) -> List[Period]:
+    """Return the periods of the enabled feeds sorted from coarser to finer.
+
+    Args:
+        feeds: Names of the enabled feeds, if None the default ones are used.
+
+    Raises:
+        ValueError: If a feed name is not a valid newsletter type.
+    """
+    if feeds is None:
+        feeds = DEFAULT_FEEDS
+    try:
+        enabled = {NewsletterType(feed) for feed in feeds}
+    except ValueError as error:
+        raise ValueError(
+            f"Unknown newsletter feed, valid ones are: "
+            f"{', '.join(type_.value for type_ in NewsletterType)}"
+        ) from error
+    return [period for type_, period in PERIODS.items() if type_ in enabled]
+
+
+def last_newsletter_changes(
+    newsletter_dir: str,
+    periods: Optional[List[Period]] = None,
+    manifest: Optional[NewsletterManifest] = None,
+) -> LastNewsletter:
     """Extract the date of the last change of the last newsletter for each feed.
 
+    The last change of a feed is the start of the period that follows the one of its
+    last newsletter.
+
     Args:
         newsletter_dir: Directory containing the newsletter articles.
+        periods: Periods of the enabled feeds.
+        manifest: Snapshot of the newsletter directory of the build.
 
     Returns:
         last_newsletter: LastNewsletter object.
     """
-    newsletters = _list_newsletters(newsletter_dir)
+    if periods is None:
+        periods = get_periods()
+    if manifest is None:
+        manifest = load_manifest(newsletter_dir)
+    newsletters = _list_newsletters(newsletter_dir, manifest)
     last = LastNewsletter()
 
-    # Year feed: Saves the first day of the next year.
-    with suppress(IndexError):
-        last.yearly = newsletters.yearly[0].date + relativedelta(years=1)
-
-    # Month feed: Saves the first day of the next month.
-    with suppress(IndexError):
-        last_file_date = newsletters.monthly[0].date
-        last.monthly = datetime.datetime(
-            last_file_date.year + int(last_file_date.month / 12),
-            ((last_file_date.month % 12) + 1),
-            1,
-            tzinfo=tz.tzlocal(),
-        )
-
-    # Week feed: Saves the next Monday from the week of the week number.
-    with suppress(IndexError):
-        last.weekly = newsletters.weekly[0].date + datetime.timedelta(days=7)
-
-    # Daily feed: Saves the next day.
-    with suppress(IndexError):
-        last.daily = newsletters.daily[0].date + datetime.timedelta(days=1)
+    for period in periods:
+        # The compacted articles were published, so they're not created again
+        dates = [
+            entry.date
+            for entry in manifest.compacted.values()
+            if entry.type_ == period.type_.value
+        ]
+        with suppress(IndexError):
+            dates.append(getattr(newsletters, period.type_.value)[0].date)
+        if dates:
+            setattr(last, period.type_.value, period.next_start(max(dates)))
 
     return last
 
 
-def _list_newsletters(newsletter_dir: str) -> Newsletters:
-    """Create a list of existing newsletters.
+def _list_newsletters(
+    newsletter_dir: str, manifest: Optional[NewsletterManifest] = None
+) -> Newsletters:
+    """Create a list of existing newsletters from the manifest.
 
     Args:
         newsletter_dir: Directory containing the newsletter articles.
+        manifest: Snapshot of the newsletter directory, if None it's loaded.
 
     Returns:
         Newsletters object.
     """
-    newsletters = Newsletters()
-    with os.scandir(newsletter_dir) as files:
-        for file_ in files:
-            if file_.name == "0_newsletter_index.md":
-                continue
-            newsletter = Newsletter(file_=Path(file_.path))
-            if newsletter.type_ == "yearly":
-                newsletters.yearly.append(newsletter)
-            elif newsletter.type_ == "monthly":
-                newsletters.monthly.append(newsletter)
-            elif newsletter.type_ == "weekly":
-                newsletters.weekly.append(newsletter)
-            elif newsletter.type_ == "daily":
-                newsletters.daily.append(newsletter)
-    newsletters.sort()
-
-    return newsletters
+    if manifest is None:
+        manifest = load_manifest(newsletter_dir)
+    return manifest.newsletters(newsletter_dir)
 
 
 def add_change_categories(changes: List[Change], config: MkDocsConfig) -> List[Change]:
@@ -164,11 +205,15 @@ def add_change_categories(changes: List[Change], config: MkDocsConfig) -> List[C
 
 
 def digital_garden_changes(
-    changes: List[Change], last_published: Optional[LastNewsletter] = None
+    changes: List[Change],
+    last_published: Optional[LastNewsletter] = None,
+    periods: Optional[List[Period]] = None,
 ) -> DigitalGardenChanges:
     """Extract the changes that need to be published for digital_garden repositories.
 
-    For a change to be published it needs to:
+    For a change to be published in a feed it needs to be made before the start of the
+    current period of the feed and after the last published change in the feed. For
+    example:
 
     year: Be made before the first day of the year and after the last published change
         in the year feed.
@@ -178,263 +223,777 @@ def digital_garden_changes(
         week feed.
     day: Be made before today and after the last published change in the day feed.
 
+    Disabled feeds don't get any change.
+
     Args:
         changes: The list of Change objects to publish.
         last_published: last published date per feed type
+        periods: Periods of the enabled feeds.
 
     Returns:
         changes: Ordered changes to publish per feed.
     """
     now = datetime.datetime.now(tz.tzlocal())
-    today = now.replace(hour=0, minute=0, second=0, microsecond=0)
-    last_first_weekday = today - datetime.timedelta(days=now.weekday())
-    last_first_monthday = today.replace(day=1)
-    last_first_yearday = today.replace(day=1, month=1)
 
     if last_published is None:
         last_published = LastNewsletter()
-
-    return DigitalGardenChanges(
-        daily=[
-            change
-            for change in changes
-            if change.date < today
-            and (last_published.daily is None or change.date > last_published.daily)
-            and change.type_ in CHANGE_TYPE_TEXT
-        ],
-        weekly=[
-            change
-            for change in changes
-            if change.date < last_first_weekday
-            and (last_published.weekly is None or change.date > last_published.weekly)
-            and change.type_ in CHANGE_TYPE_TEXT
-        ],
-        monthly=[
-            change
-            for change in changes
-            if change.date < last_first_monthday
-            and (last_published.monthly is None or change.date > last_published.monthly)
-            and change.type_ in CHANGE_TYPE_TEXT
-        ],
-        yearly=[
-            change
-            for change in changes
-            if change.date < last_first_yearday
-            and (last_published.yearly is None or change.date > last_published.yearly)
-            and change.type_ in CHANGE_TYPE_TEXT
-        ],
-    )
+    if periods is None:
+        periods = get_periods()
+
+    changes_per_feed = DigitalGardenChanges()
+    for period in periods:
+        current_period_start = period.start(now)
+        last_change = getattr(last_published, period.type_.value)
+        setattr(
+            changes_per_feed,
+            period.type_.value,
+            [
+                change
+                for change in changes
+                if change.date < current_period_start
+                and (last_change is None or change.date > last_change)
+                and change.type_ in CHANGE_TYPE_TEXT
+            ],
+        )
+    return changes_per_feed
 
 
-def create_newsletter_landing_page(config: MkDocsConfig, repo: Repo) -> None:
+def create_newsletter_landing_page(
+    config: MkDocsConfig,
+    repo: Repo,
+    periods: Optional[List[Period]] = None,
+    fsync: bool = False,
+) -> None:
     """Create the newsletter landing page."""
+    if periods is None:
+        periods = get_periods()
     base_dir = str(repo.working_dir)
     landing_path = os.path.join(base_dir, "docs/newsletter/0_newsletter_index.md")
     site_url = re.sub("/$", "", config["site_url"])
 
     if not os.path.isfile(landing_path):
-        env = Environment(
-            loader=PackageLoader("mkdocs_newsletter", "templates"),
-            autoescape=select_autoescape(["html", "xml"]),
+        template = get_template("newsletter_landing_page.j2")
+        landing_page = template.render(
+            site_url=site_url,
+            feeds=[period.type_.value for period in periods],
         )
-        template = env.get_template("newsletter_landing_page.j2")
-        landing_page = template.render(site_url=site_url)
 
-        with open(landing_path, "+w", encoding="utf-8") as landing_file:
-            landing_file.write(landing_page)
+        with FileBatch(fsync) as batch:
+            batch.write(landing_path, landing_page)
 
 
-def create_newsletters(changes: DigitalGardenChanges, repo: Repo) -> List[str]:
+def create_newsletters(
+    changes: DigitalGardenChanges,
+    repo: Repo,
+    options: Optional[NewsletterOptions] = None,
+    stats: Optional[BuildStats] = None,
+    manifest: Optional[NewsletterManifest] = None,
+) -> List[str]:
     """Create the newsletter articles from the semantic changes for all feeds.
 
     Fills the newsletter article jinja2 template and creates the related File objects.
 
+    The digest of each generated article is stored in the newsletter manifest, so the
+    articles that were edited by hand after they were generated are left untouched.
+
     Args:
         changes: The list of Change objects to publish per feed.
         repo: Git Repo object with the MkDocs repository.
+        options: Options of the build.
+        stats: Metrics of the build to update.
+        manifest: Snapshot of the newsletter directory of the build, it's updated
+            with the written articles.
 
     Returns:
         List of file paths with the newsletter articles.
     """
-    base_dir = str(repo.working_dir)
-
-    files = (
-        _create_feed_articles(changes.daily, _get_daily_newsletter_file, base_dir)
-        + _create_feed_articles(changes.weekly, _get_weekly_newsletter_file, base_dir)
-        + _create_feed_articles(changes.monthly, _get_monthly_newsletter_file, base_dir)
-        + _create_feed_articles(changes.yearly, _get_yearly_newsletter_file, base_dir)
+    if options is None:
+        options = NewsletterOptions()
+    if stats is None:
+        stats = BuildStats()
+    newsletter_dir = os.path.join(str(repo.working_dir), "docs/newsletter")
+    if not os.path.exists(newsletter_dir):
+        os.makedirs(newsletter_dir)
+    if manifest is None:
+        manifest = load_manifest(newsletter_dir)
+    articles = _skip_compacted(
+        _build_articles(changes, newsletter_dir, options), manifest
     )
+    file_paths = [
+        Path(os.path.relpath(path, newsletter_dir)).as_posix() for path, _ in articles
+    ]
+    digests = [manifest.articles.get(file_path) for file_path in file_paths]
+    for directory in {os.path.dirname(path) for path, _ in articles}:
+        os.makedirs(directory, exist_ok=True)
+    with FileBatch(options.fsync) as batch:
+        writes = _write_articles(articles, digests, batch, options)
+        for file_path, write in zip(file_paths, writes):
+            if write.edited:
+                stats.edited += 1
+                continue
+            if write.temporary_path is None:
+                stats.unchanged += 1
+            else:
+                stats.written += 1
+            manifest.articles[file_path] = manifest_entry(file_path, write.digest)
+    save_manifest(newsletter_dir, manifest)
+
+    return [newsletter_path for newsletter_path, _ in articles]
+
+
+def backfill_newsletters(
+    changes: DigitalGardenChanges,
+    repo: Repo,
+    options: Optional[NewsletterOptions] = None,
+    stats: Optional[BuildStats] = None,
+    manifest: Optional[NewsletterManifest] = None,
+) -> List[str]:
+    """Create the newsletter articles of a long history one year at a time.
 
-    return files
+    All the newsletter periods fit inside a year, so each year is built and written
+    independently with create_newsletters, and its sections are released before
+    the next one starts. As each year is written atomically, an interrupted
+    backfill resumes after the last year it wrote.
 
+    The progress, the throughput and the estimated time left are logged after each
+    year.
 
-def _create_feed_articles(
-    changes: List[Change], group_function: Callable[..., str], base_dir: str
-) -> List[str]:
-    """Create the newsletter articles from the semantic changes for a feed.
+    Args:
+        changes: The list of Change objects to publish per feed.
+        repo: Git Repo object with the MkDocs repository.
+        options: Options of the build.
+        stats: Metrics of the build to update.
+        manifest: Snapshot of the newsletter directory of the build, it's updated
+            with the written articles.
+
+    Returns:
+        List of file paths with the newsletter articles.
+    """
+    if options is None:
+        options = NewsletterOptions()
+    if stats is None:
+        stats = BuildStats()
+    if manifest is None:
+        manifest = load_manifest(os.path.join(str(repo.working_dir), "docs/newsletter"))
+    chunks = _split_changes_by_year(changes, options.periods)
+    total_changes = sum(changes_count for changes_count, _ in chunks.values())
+    done_changes = 0
+    newsletter_paths: List[str] = []
+    start = time.monotonic()
+
+    for year in sorted(chunks):
+        changes_count, year_changes = chunks.pop(year)
+        newsletter_paths += create_newsletters(
+            year_changes, repo, options, stats, manifest
+        )
+        done_changes += changes_count
+
+        elapsed = max(time.monotonic() - start, 1e-6)
+        changes_rate = done_changes / elapsed
+        log.info(
+            f"Newsletter backfill: {year} done, {done_changes}/{total_changes} "
+            f"changes, {changes_rate:.1f} changes/s, "
+            f"{len(newsletter_paths) / elapsed:.1f} articles/s, "
+            f"ETA {(total_changes - done_changes) / changes_rate:.0f}s"
+        )
+
+    return newsletter_paths
 
-    Fills the newsletter article jinja2 template and creates the related File objects.
+
+def _split_changes_by_year(
+    changes: DigitalGardenChanges, periods: List[Period]
+) -> Dict[str, Tuple[int, DigitalGardenChanges]]:
+    """Split the changes to publish of all the feeds by the year they belong to.
 
     Args:
-        changes: The list of Change objects to publish in the feed.
-        group_function: Function to group the changes in files.
-        base_dir: Directory of the MkDocs repository.
+        changes: The list of Change objects to publish per feed.
+        periods: Periods of the enabled feeds.
 
     Returns:
-        List of file paths with the newsletter articles.
+        Number of distinct changes and changes to publish per feed of each year,
+            indexed by the yearly newsletter key.
     """
-    files = []
-    changes_groups = {}
+    chunks: Dict[str, Tuple[int, DigitalGardenChanges]] = {}
+    seen = set()
 
-    newsletter_dir = os.path.join(base_dir, "docs/newsletter")
-    if not os.path.exists(newsletter_dir):
-        os.makedirs(newsletter_dir)
+    for period in periods:
+        for change in getattr(changes, period.type_.value):
+            year = calendar_day(change.date)[NewsletterType.YEARLY].key
+            changes_count, year_changes = chunks.get(year, (0, DigitalGardenChanges()))
+            if id(change) not in seen:
+                seen.add(id(change))
+                changes_count += 1
+            getattr(year_changes, period.type_.value).append(change)
+            chunks[year] = (changes_count, year_changes)
 
-    for file_name, feed_changes in itertools.groupby(changes, key=group_function):
-        changes_groups[file_name] = list(feed_changes)
+    return chunks
 
-    for file_name, changes_group in changes_groups.items():
-        newsletter_path = os.path.join(newsletter_dir, file_name)
-        with open(newsletter_path, "w+", encoding="utf-8") as newsletter_file:
-            newsletter_file.write(create_newsletter(changes_group))
-        files.append(newsletter_path)
 
-    return files
+def article_path(newsletter: Newsletter, newsletter_dir: str) -> str:
+    """Return the path of a newsletter article relative to the newsletter directory.
 
+    Args:
+        newsletter: Newsletter article.
+        newsletter_dir: Directory containing the newsletter articles.
 
-def create_newsletter(changes: List[Change]) -> str:
-    """Build the newsletter article test from the changes.
+    Returns:
+        The path with forward slashes, as used in the MkDocs nav and the URLs.
+    """
+    return Path(os.path.relpath(newsletter.file_, newsletter_dir)).as_posix()
 
-    Group first by category, then by subcategory and then by file.
+
+DailySections = Dict[str, Tuple[int, List[NewsletterSection]]]
+Article = Tuple[str, List[NewsletterSection]]
+
+
+class ChangesPartition(NamedTuple):
+    """Represent the changes to publish grouped by the article they belong to.
+
+    Attributes:
+        feeds: Changes of each article indexed by the feed type and the article key.
+        days: Changes of all the feeds indexed by the daily newsletter key.
+        day_keys: Daily newsletter key of each change indexed by the change id.
+    """
+
+    feeds: Dict[NewsletterType, Dict[str, List[Change]]]
+    days: Dict[str, List[Change]]
+    day_keys: Dict[int, str]
+
+
+def _partition_changes(
+    changes: DigitalGardenChanges, periods: List[Period]
+) -> ChangesPartition:
+    """Group the changes of all the feeds by the article they belong to.
+
+    The changes don't need to be sorted. The period spans of a change are looked up
+    once in the calendar table, even if the change is published in many feeds.
 
     Args:
-        changes: List of changes to publish in the article
+        changes: The list of Change objects to publish per feed.
+        periods: Periods of the enabled feeds.
 
     Returns:
-        Article markdown text.
+        The changes grouped by feed and article, and by day.
+    """
+    partition = ChangesPartition(feeds={}, days={}, day_keys={})
+    spans: Dict[int, Dict[NewsletterType, PeriodSpan]] = {}
+
+    for period in periods:
+        articles = partition.feeds.setdefault(period.type_, {})
+        for change in getattr(changes, period.type_.value):
+            change_id = id(change)
+            try:
+                change_spans = spans[change_id]
+            except KeyError:
+                change_spans = spans[change_id] = calendar_day(change.date)
+                day_key = change_spans[NewsletterType.DAILY].key
+                partition.day_keys[change_id] = day_key
+                partition.days.setdefault(day_key, []).append(change)
+            articles.setdefault(change_spans[period.type_].key, []).append(change)
+
+    return partition
+
+
+def _build_daily_sections(partition: ChangesPartition) -> DailySections:
+    """Build the newsletter sections of each day once for all the feeds.
+
+    Args:
+        partition: Changes to publish grouped by day.
+
+    Returns:
+        Dictionary with the number of changes and the sections of each day, indexed
+            by the daily newsletter key.
+    """
+    return {
+        day: (len(changes_group), _build_newsletter_sections(changes_group))
+        for day, changes_group in partition.days.items()
+    }
+
+
+def _build_articles(
+    changes: DigitalGardenChanges, newsletter_dir: str, options: NewsletterOptions
+) -> List[Article]:
+    """Build the newsletter articles of all the enabled feeds.
+
+    Args:
+        changes: The list of Change objects to publish per feed.
+        newsletter_dir: Directory containing the newsletter articles.
+        options: Options of the build.
+
+    Returns:
+        List of the file paths of the newsletter articles with their sections, from
+            the finer to the coarser feed.
+    """
+    partition = _partition_changes(changes, options.periods)
+    daily_sections = _build_daily_sections(partition)
+
+    articles = []
+    for period in reversed(options.periods):
+        feed_options = options
+        if period is options.periods[-1]:
+            # The finest feed is not merged so the change descriptions are published
+            feed_options = options.copy(update={"merge_threshold": 0})
+        articles += _build_feed_articles(
+            partition.feeds[period.type_],
+            newsletter_dir,
+            daily_sections,
+            partition.day_keys,
+            feed_options,
+        )
+    return articles
+
+
+def _skip_compacted(
+    articles: List[Article], manifest: NewsletterManifest
+) -> List[Article]:
+    """Remove the articles that were compacted by the retention policy.
+
+    Args:
+        articles: File paths of the newsletter articles with their sections.
+        manifest: Snapshot of the newsletter directory of the build.
+    """
+    if not manifest.compacted:
+        return articles
+    compacted = {
+        posixpath.splitext(posixpath.basename(file_path))[0]
+        for file_path in manifest.compacted
+    }
+    return [
+        article
+        for article in articles
+        if os.path.splitext(os.path.basename(article[0]))[0] not in compacted
+    ]
+
+
+def _build_feed_articles(
+    changes_groups: Dict[str, List[Change]],
+    newsletter_dir: str,
+    daily_sections: DailySections,
+    day_keys: Dict[int, str],
+    options: NewsletterOptions,
+) -> List[Article]:
+    """Build the newsletter articles from the semantic changes for a feed.
+
+    Args:
+        changes_groups: Changes of each article of the feed indexed by the article key.
+        newsletter_dir: Directory containing the newsletter articles.
+        daily_sections: Sections already built for each day.
+        day_keys: Daily newsletter key of each change indexed by the change id.
+        options: Options of the build, with the merge threshold and the layout.
+
+    Returns:
+        List of the file paths of the newsletter articles with their sections.
+    """
+    return [
+        (
+            os.path.join(newsletter_dir, options.layout.file_path(key)),
+            _merge_repeated_changes(
+                _roll_up_sections(changes_group, daily_sections, day_keys),
+                options.merge_threshold,
+            ),
+        )
+        for key, changes_group in changes_groups.items()
+    ]
+
+
+def _write_articles(
+    articles: List[Article],
+    digests: List[Optional[ManifestEntry]],
+    batch: FileBatch,
+    options: NewsletterOptions,
+) -> List[FileWrite]:
+    """Render and write the newsletter articles.
+
+    Each article is independent of the rest, so they can be rendered and written
+    concurrently by a pool of threads or processes. The results are returned in the
+    same order as the articles regardless of when each of them finishes.
+
+    The articles are written to temporary files that are added to the batch, so
+    they replace the existing ones only once all of them are rendered.
+
+    Args:
+        articles: File paths of the newsletter articles with their sections.
+        digests: Manifest entry of each article, None if it was never generated.
+        batch: Batch of files the written articles are added to.
+        options: Options of the build, with the workers that render the articles
+            and the templates they use.
+
+    Returns:
+        The result of writing each article.
+
+    Raises:
+        ValueError: If the executor is not valid.
     """
-    env = Environment(
-        loader=PackageLoader("mkdocs_newsletter", "templates"),
-        autoescape=select_autoescape(["html", "xml"]),
+    expected_digests = [None if entry is None else entry.digest for entry in digests]
+    if options.workers < 1 or len(articles) < 2:
+        return [
+            _add_to_batch(
+                batch, _write_article(path, sections, digest, batch.fsync), path
+            )
+            for (path, sections), digest in zip(articles, expected_digests)
+        ]
+
+    futures = run_pool(
+        _write_article,
+        [
+            (path, sections, digest, batch.fsync)
+            for (path, sections), digest in zip(articles, expected_digests)
+        ],
+        options.workers,
+        options.executor,
+        partial(configure_templates, options.templates_dir, options.cache_dir),
     )
-    template = env.get_template("newsletter_article.j2")
 
-    sections = _build_newsletter_sections(changes)
+    # Add all the written articles to the batch before raising the first error, so
+    # that the batch rollback removes their temporary files.
+    written = [
+        _add_to_batch(batch, future.result(), path)
+        for (path, _), future in zip(articles, futures)
+        if future.exception() is None
+    ]
+    for future in futures:
+        future.result()
+    return written
 
-    article = template.render(sections=sections, change_type_text=CHANGE_TYPE_TEXT)
-    article = re.sub(r"\n\n+", r"\n\n", article).strip()
 
-    return article
+def _add_to_batch(batch: FileBatch, write: FileWrite, path: str) -> FileWrite:
+    """Add the temporary file of an article to the batch if it was written.
 
+    Args:
+        batch: Batch of files to update.
+        write: Result of writing the article.
+        path: Path of the newsletter article.
 
-def _build_newsletter_sections(
-    changes: List[Change],
+    Returns:
+        The result of writing the article.
+    """
+    if write.temporary_path is not None:
+        batch.add(write.temporary_path, path)
+    return write
+
+
+def _write_article(
+    newsletter_path: str,
+    sections: List[NewsletterSection],
+    expected_digest: Optional[str] = None,
+    fsync: bool = False,
+) -> FileWrite:
+    """Render and write a newsletter article to a temporary file.
+
+    Args:
+        newsletter_path: Path of the newsletter article.
+        sections: Sections of the article.
+        expected_digest: Digest of the content last generated for the article.
+        fsync: Whether to flush the temporary file to the disk.
+
+    Returns:
+        The result of writing the article.
+    """
+    return write_if_changed(
+        newsletter_path,
+        _generate_newsletter(sections, markers=True),
+        expected_digest,
+        fsync,
+    )
+
+
+def _roll_up_sections(
+    changes: List[Change], daily_sections: DailySections, day_keys: Dict[int, str]
 ) -> List[NewsletterSection]:
-    """Create the newsletter sections from the changes.
+    """Build the sections of an article merging the sections of its days.
+
+    The days whose changes are all part of the article reuse the sections already
+    built, the rest are built from their changes.
 
     Args:
         changes: The list of Change objects to publish in the article.
+        daily_sections: Sections already built for each day.
+        day_keys: Daily newsletter key of each change indexed by the change id.
 
     Returns:
         A list of sections containing the changes.
     """
-    sections = []
+    day_changes: Dict[str, List[Change]] = {}
+    for change in changes:
+        day_changes.setdefault(day_keys[id(change)], []).append(change)
+
+    sections_groups = []
+    for day, changes_group in day_changes.items():
+        with suppress(KeyError):
+            changes_number, sections = daily_sections[day]
+            if changes_number == len(changes_group):
+                sections_groups.append(sections)
+                continue
+        sections_groups.append(_build_newsletter_sections(changes_group))
 
-    # Sort by category, subcategory, file and date
+    return _merge_newsletter_sections(sections_groups)
 
-    category_changes_groups = _group_semantic_changes(changes, "category")
 
-    for category_changes in category_changes_groups:
-        category_section, subcategory_changes = _build_newsletter_section(
-            category_changes, "category", "subcategory"
-        )
+def _merge_newsletter_sections(
+    sections_groups: List[List[NewsletterSection]],
+) -> List[NewsletterSection]:
+    """Merge already built section trees into one.
 
-        subcategory_changes_groups = _group_semantic_changes(
-            subcategory_changes, "subcategory"
-        )
-        for subcategory_changes in subcategory_changes_groups:
-            subcategory_section, file_changes = _build_newsletter_section(
-                subcategory_changes, "subcategory", "file_section"
-            )
+    The sections of each group are sorted by order and their changes by date, so
+    they're merged level by level without sorting again. The merged sections are
+    copies, so the original trees are not modified.
+
+    Args:
+        sections_groups: Lists of sorted sections to merge.
 
-            file_changes_groups = _group_semantic_changes(file_changes, "file_section")
-            for file_changes in file_changes_groups:
-                file_section, dummy = _build_newsletter_section(
-                    file_changes, "file_section", None
+    Returns:
+        The sorted list of merged sections.
+    """
+    merged: List[NewsletterSection] = []
+    for section in heapq.merge(*sections_groups, key=operator.attrgetter("order")):
+        if merged and merged[-1].order == section.order:
+            merged_section = merged[-1]
+            merged_section.url = merged_section.url or section.url
+            merged_section.changes = list(
+                heapq.merge(
+                    merged_section.changes,
+                    section.changes,
+                    key=operator.attrgetter("date"),
                 )
-                subcategory_section.subsections.append(file_section)
-            category_section.subsections.append(subcategory_section)
-        sections.append(category_section)
-    return sections
+            )
+            merged_section.subsections = _merge_newsletter_sections(
+                [merged_section.subsections, section.subsections]
+            )
+        else:
+            merged.append(section.copy())
+    return merged
+
+
+def create_newsletter(changes: List[Change], merge_threshold: int = 0) -> str:
+    """Build the newsletter article test from the changes.
+
+    Group first by category, then by subcategory and then by file.
+
+    Args:
+        changes: List of changes to publish in the article
+        merge_threshold: Maximum number of changes of the same type and file that are
+            shown before they're merged into one. 0 disables it.
+
+    Returns:
+        Article markdown text.
+    """
+    return _render_newsletter(
+        _merge_repeated_changes(_build_newsletter_sections(changes), merge_threshold)
+    )
 
 
-def _group_semantic_changes(changes: List[Change], key: str) -> List[List[Change]]:
-    """Group semantic changes by a key.
+def _render_newsletter(sections: List[NewsletterSection]) -> str:
+    """Render the newsletter article text from its sections.
 
     Args:
-        changes: List of changes to group
+        sections: Sections of the article.
 
     Returns:
-        A list of lists of changes that share the same group.
+        Article markdown text.
     """
-    changes_groups = []
-    criteria = operator.attrgetter(f"{key}_order")
+    return "".join(_generate_newsletter(sections))
+
 
-    changes = sorted(changes, key=criteria)
-    for _sorted_key, changes_group in itertools.groupby(changes, key=criteria):
-        changes_groups.append(list(changes_group))
+def _generate_newsletter(
+    sections: List[NewsletterSection], markers: bool = False
+) -> Iterator[str]:
+    """Render the newsletter article text from its sections as a stream of chunks.
 
-    return changes_groups
+    The template leaves blank lines wherever a block is skipped, so the chunks go
+    through an incremental collapser instead of post-processing the whole article.
 
+    Args:
+        sections: Sections of the article.
+        markers: Whether to surround the article with the markers that delimit it
+            in the built page.
+
+    Yields:
+        Chunks of the article markdown text.
+    """
+    template = get_template("newsletter_article.j2")
+    context: Dict[str, Any] = {
+        "sections": sections,
+        "change_type_text": CHANGE_TYPE_TEXT,
+    }
+    if markers:
+        context.update(article_begin=ARTICLE_BEGIN, article_end=ARTICLE_END)
+
+    yield from _collapse_blank_lines(template.generate(**context))
+
+
+def _collapse_blank_lines(chunks: Iterable[str]) -> Iterator[str]:
+    """Collapse the consecutive blank lines and strip the text of a stream of chunks.
+
+    The whitespace at the end of each chunk is held back until the next chunk with
+    text arrives, so the runs of new lines that span many chunks are collapsed, and
+    the trailing whitespace of the text is never yielded.
+
+    Args:
+        chunks: Chunks of text.
 
-def _build_newsletter_section(
+    Yields:
+        Chunks of the text without leading or trailing whitespace and with at most
+            one blank line in a row.
+    """
+    started = False
+    pending = ""
+    for chunk in chunks:
+        text = re.sub(r"\n\n+", r"\n\n", pending + chunk)
+        body = text.rstrip()
+        pending = text[len(body) :]
+        if not started:
+            body = body.lstrip()
+            started = body != ""
+        if body:
+            yield body
+
+
+def _build_newsletter_sections(
     changes: List[Change],
-    section_attr: str,
-    subsection_attr: Optional[str],
-) -> Tuple[NewsletterSection, List[Change]]:
-    """Create a newsletter section from the changes.
+) -> List[NewsletterSection]:
+    """Create the newsletter sections from the changes.
 
-    Ignore changes that are not part of CHANGE_TYPE_TEXT.
+    The changes are sorted once by category, subcategory, file and date, so the
+    sections tree is built in a single sweep, opening a new section each time the
+    order of one of the levels changes.
 
     Args:
-        changes: The list of Change objects of the section.
-        section_attr: Change attribute name that represents the section.
-        subsection_attr: Change attribute name that represents the subsection.
+        changes: The list of Change objects to publish in the article.
 
     Returns:
-        A tuple with the section object and the changes that belong to the subsection.
+        A list of sections containing the changes.
     """
-    section = NewsletterSection(
-        title=getattr(changes[0], section_attr),
-        order=getattr(changes[0], f"{section_attr}_order"),
-    )
-    subsection_changes = []
-    for change in changes:
-        if subsection_attr is None or getattr(change, subsection_attr) is None:
-            section.url = change.file_
-            section.changes.append(change)
-        else:
-            subsection_changes.append(change)
-    section.changes = sorted(section.changes, key=operator.attrgetter("date"))
-    return section, subsection_changes
+    sections: List[NewsletterSection] = []
+    category_section: Optional[NewsletterSection] = None
+    subcategory_section: Optional[NewsletterSection] = None
+    file_section: Optional[NewsletterSection] = None
+
+    for change in sorted(changes, key=_section_sort_key):
+        if category_section is None or change.category_order != category_section.order:
+            # The orders are always set for the changes with a category
+            category_section = NewsletterSection(
+                title=change.category, order=change.category_order  # type: ignore
+            )
+            sections.append(category_section)
+            subcategory_section = None
+        if change.subcategory is None:
+            category_section.url = change.file_
+            category_section.changes.append(change)
+            continue
 
+        if (
+            subcategory_section is None
+            or change.subcategory_order != subcategory_section.order
+        ):
+            subcategory_section = NewsletterSection(
+                title=change.subcategory,
+                order=change.subcategory_order,  # type: ignore
+            )
+            category_section.subsections.append(subcategory_section)
+            file_section = None
+        if change.file_section is None:
+            subcategory_section.url = change.file_
+            subcategory_section.changes.append(change)
+            continue
 
-def _get_daily_newsletter_file(change: Change) -> str:
-    """Return the newsletter file name of the daily feed."""
-    return change.date.strftime("%Y_%m_%d.md")
+        if file_section is None or change.file_section_order != file_section.order:
+            file_section = NewsletterSection(
+                title=change.file_section,
+                order=change.file_section_order,  # type: ignore
+            )
+            subcategory_section.subsections.append(file_section)
+        file_section.url = change.file_
+        file_section.changes.append(change)
+
+    return sections
 
 
-def _get_weekly_newsletter_file(change: Change) -> str:
-    """Return the newsletter file name of the weekly feed."""
-    week_number = int(change.date.strftime("%W"))
-    return f'{change.date.strftime("%Y")}_w{week_number:02}.md'
+def _section_sort_key(change: Change) -> Tuple[Any, ...]:
+    """Build the key to sort the changes in the order of the newsletter sections.
 
+    The changes that don't belong to a subcategory or a file section go before the
+    ones that do, as they are printed in the parent section.
 
-def _get_monthly_newsletter_file(change: Change) -> str:
-    """Return the newsletter file name of the monthly feed."""
-    return change.date.strftime("%Y_%m.md")
+    Args:
+        change: Change to sort.
+
+    Returns:
+        The category, subcategory, file section and date sort key.
+    """
+    if change.subcategory is None:
+        return (change.category_order, (0, 0), (0, 0), change.date)
+    if change.file_section is None:
+        return (
+            change.category_order,
+            (1, change.subcategory_order),
+            (0, 0),
+            change.date,
+        )
+    return (
+        change.category_order,
+        (1, change.subcategory_order),
+        (1, change.file_section_order),
+        change.date,
+    )
 
 
-def _get_yearly_newsletter_file(change: Change) -> str:
-    """Return the newsletter file name of the yearly feed."""
-    return change.date.strftime("%Y.md")
+def _merge_repeated_changes(
+    sections: List[NewsletterSection], threshold: int
+) -> List[NewsletterSection]:
+    """Merge the changes of the same type and file that exceed the threshold.
+
+    The merged changes are replaced by a single change placed where the first one
+    was, whose summary is the number of changes and whose message is the list of
+    their summaries. The descriptions of the changes are left out, so the articles
+    of the finest feed must not be merged to publish them.
+
+    The sections may be shared with other articles, so they are copied instead of
+    modified.
+
+    Args:
+        sections: Sections of the article.
+        threshold: Maximum number of changes of the same type and file that are
+            shown before they're merged into one. 0 disables it.
+
+    Returns:
+        The sections with the merged changes.
+    """
+    if threshold < 1:
+        return sections
+
+    merged_sections = []
+    for section in sections:
+        groups: Dict[Tuple[str, Optional[str]], List[Change]] = {}
+        for change in section.changes:
+            if change.file_ is not None:
+                groups.setdefault((change.file_, change.type_), []).append(change)
+
+        changes = []
+        for change in section.changes:
+            group = groups.get((change.file_ or "", change.type_), [change])
+            if len(group) <= threshold:
+                changes.append(change)
+            elif change is group[0]:
+                changes.append(
+                    group[-1].copy(
+                        update={
+                            "summary": f"{len(group)} changes.",
+                            "message": "\n".join(
+                                f"* {merged_change.summary}" for merged_change in group
+                            ),
+                            "file_subsection": None,
+                        }
+                    )
+                )
+
+        merged_sections.append(
+            section.copy(
+                update={
+                    "changes": changes,
+                    "subsections": _merge_repeated_changes(
+                        section.subsections, threshold
+                    ),
+                }
+            )
+        )
+    return merged_sections
@@ -1,65 +1,177 @@
 """Define the RSS management services."""
 
 import datetime
+import hashlib
 import os
 import re
 from contextlib import suppress
-from typing import List, Optional
+from typing import Dict, List, NamedTuple, Optional, Tuple
 
-from bs4 import BeautifulSoup
-from jinja2 import Environment, PackageLoader, select_autoescape
 from mkdocs.config.base import Config
-
-from ..model import Feed, FeedEntry, NewsletterType
+from pydantic import ValidationError
+
+from ..adapters.files import FileBatch
+from ..adapters.html import article_digest, read_article, remove_article_markers
+from ..adapters.pool import run_pool
+from ..adapters.templates import get_template
+from ..model import (
+    PERIODS,
+    BuildStats,
+    Feed,
+    FeedEntriesCache,
+    FeedEntry,
+    Newsletter,
+    NewsletterManifest,
+    NewsletterOptions,
+    NewsletterType,
+)
 from ..version import __version__
-from .newsletter import _list_newsletters
+from .newsletter import _list_newsletters, article_path
+
+# Number of newsletters of each feed
+FEED_ENTRIES = 16
+
 
-TTL = {
-    "daily": 1440,
-    "weekly": 10080,
-    "monthly": 43200,
-    "yearly": 525600,
-}
+class FeedSite(NamedTuple):
+    """Represent the data of the site the RSS entries are built from.
 
+    Attributes:
+        url: URL of the site without the trailing slash.
+        author: author name.
+        pages_dir: Directory of the built newsletter pages.
+        articles_dir: Directory of the newsletter articles.
+    """
+
+    url: str
+    author: Optional[str]
+    pages_dir: str
+    articles_dir: str
+
+
+def create_rss(
+    config: Config,
+    working_dir: str,
+    options: Optional[NewsletterOptions] = None,
+    manifest: Optional[NewsletterManifest] = None,
+    stats: Optional[BuildStats] = None,
+) -> None:
+    """Create RSS feed with the newsletters of each enabled period.
+
+    The newsletters are listed once for all the feeds, and the entries of all the
+    feeds are extracted together, so the pages can be parsed concurrently by a
+    pool of workers. The feeds are replaced together once all of them are
+    rendered, so the readers never get a truncated feed.
+
+    If the cache directory is set, the entries extracted from the built pages are
+    stored in it, so only the pages that are new or changed are parsed in the next
+    builds.
+    """
+    if options is None:
+        options = NewsletterOptions()
+    if stats is None:
+        stats = BuildStats()
+    template = get_template("rss.xml.j2")
+    newsletters = _list_newsletters(
+        os.path.join(working_dir, "docs/newsletter"), manifest
+    )
+    cache = None
+    if options.cache_dir is not None:
+        cache = _load_feed_entries_cache(options.cache_dir)
+    feed_types = [period.type_.value for period in options.periods]
+    feed_newsletters = [
+        getattr(newsletters, feed_type)[:FEED_ENTRIES] for feed_type in feed_types
+    ]
+    entries = _build_rss_entries(
+        _feed_site(config, working_dir),
+        [newsletter for feed in feed_newsletters for newsletter in feed],
+        cache,
+        stats,
+        options,
+    )
+    with FileBatch(options.fsync) as batch:
+        for feed_type, feed in zip(feed_types, feed_newsletters):
+            feed_entries, entries = entries[: len(feed)], entries[len(feed) :]
+            batch.write(
+                os.path.join(config["site_dir"], f"{feed_type}.xml"),
+                template.render(
+                    feed=build_rss_feed(config, working_dir, feed_type, feed_entries)
+                ),
+            )
+        # Only the entries of the current pages are kept
+        if (
+            options.cache_dir is not None
+            and cache is not None
+            and (cache.prune() or stats.feed_entries_parsed)
+        ):
+            os.makedirs(options.cache_dir, exist_ok=True)
+            batch.write(_feed_entries_cache_path(options.cache_dir), cache.json())
+
+
+def _feed_site(config: Config, working_dir: str) -> FeedSite:
+    """Gather the data of the site the RSS entries are built from.
 
-def create_rss(config: Config, working_dir: str) -> None:
-    """Create RSS feed with the newsletters of a period."""
-    feed_types = [type_.value for type_ in NewsletterType]
-    for feed_type in feed_types:
-        feed = build_rss_feed(config, working_dir, feed_type)
+    Args:
+        config: MkDocs config object.
+        working_dir: Mkdocs root directory.
+    """
+    return FeedSite(
+        url=re.sub("/$", "", config["site_url"]),
+        author=config.get("site_author"),
+        pages_dir=os.path.join(
+            working_dir, f'{config.get("site_dir", "site")}/newsletter'
+        ),
+        articles_dir=os.path.join(working_dir, "docs/newsletter"),
+    )
 
-        env = Environment(
-            loader=PackageLoader("mkdocs_newsletter", "templates"),
-            autoescape=select_autoescape(["html", "xml"]),
-        )
-        template = env.get_template("rss.xml.j2")
 
-        feed_path = os.path.join(config["site_dir"], f"{feed_type}.xml")
-        feed_content = template.render(feed=feed)
-        with open(feed_path, "+w", encoding="utf-8") as feed_file:
-            feed_file.write(feed_content)
+def _load_feed_entries_cache(cache_dir: str) -> FeedEntriesCache:
+    """Load the cache of RSS entries.
 
+    The cache is discarded when it was created by another version of the plugin,
+    as the extraction of the entries may have changed.
 
-def build_rss_feed(config: Config, working_dir: str, type_: str) -> Feed:
+    Args:
+        cache_dir: Directory that holds the cache.
+    """
+    with suppress(FileNotFoundError, ValidationError):
+        cache = FeedEntriesCache.parse_file(_feed_entries_cache_path(cache_dir))
+        if cache.version == __version__:
+            return cache
+    return FeedEntriesCache(version=__version__)
+
+
+def _feed_entries_cache_path(cache_dir: str) -> str:
+    """Return the path of the cache of RSS entries."""
+    return os.path.join(cache_dir, "feed_entries.json")
+
+
+def build_rss_feed(
+    config: Config,
+    working_dir: str,
+    type_: str,
+    entries: Optional[List[FeedEntry]] = None,
+) -> Feed:
     """Create the RSS feed data from the content.
 
     Args:
         config: MkDocs config object.
-        type_: type of feed, one of: daily, weekly, monthly or yearly.
+        type_: type of feed, one of: daily, weekly, monthly, quarterly or yearly.
+        entries: Entries of the feed, if None they're extracted from the built
+            pages of the newsletters.
 
     Returns:
         Feed object with the data
     """
-    site_url = re.sub("/$", "", config["site_url"])
+    site = _feed_site(config, working_dir)
 
     try:
-        logo_url: Optional[str] = f"{site_url}/{config['theme']['logo']}"
+        logo_url: Optional[str] = f"{site.url}/{config['theme']['logo']}"
     except KeyError:
         logo_url = None
 
-    author = config.get("site_author")
-
-    entries = _build_rss_entries(config, working_dir, type_, author)
+    if entries is None:
+        newsletters = _list_newsletters(site.articles_dir)
+        entries = _build_rss_entries(site, getattr(newsletters, type_)[:FEED_ENTRIES])
 
     try:
         published = max(entries).published
@@ -67,96 +179,204 @@ def build_rss_feed(config: Config, working_dir: str, type_: str) -> Feed:
         published = datetime.datetime.now()
 
     return Feed(
-        ttl=TTL[type_],
+        ttl=PERIODS[NewsletterType(type_)].ttl,
         generator=f"mkdocs-newsletter - v{__version__}",
         title=config.get("site_name"),
-        link=site_url,  # type: ignore
-        rss_link=f"{site_url}/{type_}.xml",  # type: ignore
+        link=site.url,  # type: ignore
+        rss_link=f"{site.url}/{type_}.xml",  # type: ignore
         logo=logo_url,  # type: ignore
         description=config.get("site_description"),
-        author=author,
+        author=site.author,
         published=published,
         entries=entries,
     )
 
 
 def _build_rss_entries(
-    config: Config,
-    working_dir: str,
-    type_: str,
-    author: Optional[str],
+    site: FeedSite,
+    newsletters: List[Newsletter],
+    cache: Optional[FeedEntriesCache] = None,
+    stats: Optional[BuildStats] = None,
+    options: Optional[NewsletterOptions] = None,
 ) -> List[FeedEntry]:
-    """Create the RSS feed entries for a feed type.
+    """Create the RSS feed entries of the newsletters.
+
+    The entries of the pages whose content didn't change are taken from the cache,
+    and each page is parsed once even if its newsletter appears many times. The
+    pages are independent of each other, so they can be parsed concurrently by a
+    pool of threads or processes.
 
     Args:
-        config: MkDocs config object.
-        type_: type of feed, one of: daily, weekly, monthly or yearly.
-        working_dir: Mkdocs root directory.
-        author: author name.
+        site: Data of the site.
+        newsletters: Newsletters of the entries.
+        cache: Entries extracted from the built pages in previous builds.
+        stats: Metrics of the build, updated with the cached and parsed entries.
+        options: Options of the build, with the workers and the parser that read
+            the pages.
 
     Returns:
-        List of FeedEntry objects with the data.
+        List of FeedEntry objects with the data, in the order of the newsletters.
+
+    Raises:
+        ValueError: If the executor is not valid.
+    """
+    if stats is None:
+        stats = BuildStats()
+    if options is None:
+        options = NewsletterOptions()
+
+    url_paths: List[str] = []
+    entries: Dict[str, FeedEntry] = {}
+    keys: Dict[str, str] = {}
+    to_parse: Dict[str, Tuple[FeedSite, Newsletter, str, Optional[str]]] = {}
+    for newsletter in newsletters:
+        # The article path without the extension is its URL in the site
+        url_path = os.path.splitext(article_path(newsletter, site.articles_dir))[0]
+        url_paths.append(url_path)
+        if url_path in entries or url_path in to_parse:
+            continue
+
+        entry = None
+        if cache is not None:
+            keys[url_path] = _feed_entry_key(site, url_path)
+            entry = cache.get(keys[url_path])
+        if entry is None:
+            to_parse[url_path] = (site, newsletter, url_path, options.html_parser)
+        else:
+            entries[url_path] = entry
+            stats.feed_entries_cached += 1
+
+    for url_path, entry in zip(
+        to_parse,
+        _parse_feed_entries(list(to_parse.values()), options.workers, options.executor),
+    ):
+        entries[url_path] = entry
+        stats.feed_entries_parsed += 1
+        if cache is not None:
+            cache.add(keys[url_path], entry)
+
+    return [entries[url_path] for url_path in url_paths]
+
+
+def _parse_feed_entries(
+    pages: List[Tuple[FeedSite, Newsletter, str, Optional[str]]],
+    workers: int = 0,
+    executor: str = "thread",
+) -> List[FeedEntry]:
+    """Extract the RSS entries of many built pages.
+
+    Args:
+        pages: Arguments of _parse_feed_entry for each page.
+        workers: Number of workers of the pool. 0 parses the pages sequentially.
+        executor: Type of the workers, either "thread" or "process".
+
+    Returns:
+        The entries in the same order as the pages.
+
+    Raises:
+        ValueError: If the executor is not valid.
+    """
+    if workers < 1 or len(pages) < 2:
+        return [_parse_feed_entry(*page) for page in pages]
+
+    return [
+        future.result()
+        for future in run_pool(_parse_feed_entry, pages, workers, executor)
+    ]
+
+
+def _feed_entry_key(site: FeedSite, url_path: str) -> str:
+    """Return the key of the RSS entry of a built page in the cache.
+
+    Only the article of the page is digested, as the site navigation of every page
+    changes each time a newsletter is published.
+
+    Args:
+        site: Data of the site.
+        url_path: Path of the page relative to the newsletter URL.
     """
-    entries = []
-    site_url = re.sub("/$", "", config["site_url"])
+    page_path = _page_path(site, url_path)
+    page_digest = article_digest(page_path)
+    if page_digest is None:
+        raise FileNotFoundError(f"Could not find the built page {page_path}")
+    digest = hashlib.sha256(page_digest)
+    digest.update(f"{_page_link(site, url_path)}\n{site.author}".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _page_path(site: FeedSite, url_path: str) -> str:
+    """Return the path of the built page of a newsletter."""
+    return f"{site.pages_dir}/{url_path}/index.html"
+
 
-    newsletter_dir = os.path.join(
-        working_dir, f'{config.get("site_dir", "site")}/newsletter'
+def _page_link(site: FeedSite, url_path: str) -> str:
+    """Return the URL of the built page of a newsletter."""
+    return f"{site.url}/newsletter/{url_path}/"
+
+
+def _parse_feed_entry(
+    site: FeedSite,
+    newsletter: Newsletter,
+    url_path: str,
+    parser: Optional[str] = None,
+) -> FeedEntry:
+    """Extract the RSS entry of a newsletter from its built page.
+
+    Args:
+        site: Data of the site.
+        newsletter: Newsletter of the page.
+        url_path: Path of the page relative to the newsletter URL.
+        parser: Parser that reads the article, None uses the fastest one that is
+            installed.
+
+    Returns:
+        The entry with the article cleaned of the theme elements.
+    """
+    html = read_article(_page_path(site, url_path), parser)
+
+    try:
+        if html.find("span", {"class": "timeago"}) is None:
+            raise ValueError("Could not find timeago")
+        # ignore: The object doesn't have __getitem__ defined but it still works.
+        # It's probably a typing error
+        published = html.find("span", {"class": "timeago"})["datetime"]  # type: ignore
+    except IndexError:
+        published = newsletter.date.isoformat()
+
+    # Clean the source code
+
+    # Remove the h1 as it's already in the title
+    if html.article is None:
+        raise ValueError("Could not find the article")
+    if html.article.h1 is None:
+        raise ValueError("Could not find h1 title")
+    title = html.article.h1.text
+    html.article.h1.extract()
+
+    # Remove the Last updated: line
+    with suppress(AttributeError):
+        if html.article.div is None:
+            raise AttributeError
+        html.article.div.extract()
+
+    # Remove the permalinks
+    for permalink in html.article.find_all("a", {"class": "headerlink"}):
+        permalink.extract()
+
+    remove_article_markers(html.article)
+
+    # The relative links go up from the article page to the site root
+    root_path = "../" * (url_path.count("/") + 2)
+    description = re.sub(
+        f'<a href="{re.escape(root_path)}',
+        f'<a href="{site.url}/',
+        str(html.article),
     )
 
-    for newsletter in getattr(
-        _list_newsletters(os.path.join(working_dir, "docs/newsletter")), type_
-    ):
-        with open(
-            f"{newsletter_dir}/{newsletter.basename}/index.html", "r", encoding="utf-8"
-        ) as newsletter_file:
-            html = BeautifulSoup(newsletter_file, "html.parser")
-
-        try:
-            if html.find("span", {"class": "timeago"}) is None:
-                raise ValueError("Could not find timeago")
-            # ignore: The object doesn't have __getitem__ defined but it still works.
-            # It's probably a typing error
-            published = html.find("span", {"class": "timeago"})[
-                "datetime"
-            ]  # type: ignore
-        except IndexError:
-            published = newsletter.date.isoformat()
-
-        # Clean the source code
-
-        # Remove the h1 as it's already in the title
-        if html.article is None:
-            raise ValueError("Could not find the article")
-        if html.article.h1 is None:
-            raise ValueError("Could not find h1 title")
-        title = html.article.h1.text
-        html.article.h1.extract()
-
-        # Remove the Last updated: line
-        with suppress(AttributeError):
-            if html.article.div is None:
-                raise AttributeError
-            html.article.div.extract()
-
-        # Remove the permalinks
-        for permalink in html.article.find_all("a", {"class": "headerlink"}):
-            permalink.extract()
-
-        description = re.sub(
-            r'<a href="../../', f'<a href="{site_url}/', str(html.article)
-        )
-
-        entry = FeedEntry(
-            title=title,
-            link=f"{site_url}/newsletter/{newsletter.basename}/",  # type: ignore
-            published=published,
-            description=description,
-            author=author,
-        )
-        entries.append(entry)
-
-        if len(entries) > 15:
-            break
-
-    return entries
+    return FeedEntry(
+        title=title,
+        link=_page_link(site, url_path),  # type: ignore
+        published=published,
+        description=description,
+        author=site.author,
+    )
@@ -0,0 +1,150 @@
+"""Define the search index services."""
+
+import json
+import os
+import posixpath
+import re
+from typing import Any, Dict, List
+
+from mkdocs.config.base import Config
+from mkdocs.config.defaults import MkDocsConfig
+
+from ..adapters.files import FileBatch
+from ..model import NewsletterManifest
+
+SHARD_FILE = "newsletter_index.json"
+LOADER_FILE = "newsletter_search.js"
+LOADER_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "assets", LOADER_FILE
+)
+
+
+def add_search_loader(config: MkDocsConfig) -> MkDocsConfig:
+    """Add the script that searches the newsletter shard to the site.
+
+    The script is served from the search directory, next to the shard, and it
+    downloads the shard the first time the reader searches. It's only added if the
+    site has a search plugin, like `search` or the `material/search` of the
+    material theme.
+
+    Args:
+        config: MkDocs config object.
+
+    Returns:
+        The config object with the script in its extra javascript.
+    """
+    if any(name == "search" or name.endswith("/search") for name in config["plugins"]):
+        config["extra_javascript"].append(f"search/{LOADER_FILE}")
+    return config
+
+
+def split_search_index(
+    config: Config,
+    working_dir: str,
+    manifest: NewsletterManifest,
+    fsync: bool = False,
+) -> None:
+    """Move the newsletter articles out of the search index of the site.
+
+    The articles repeat the summaries and descriptions of all the changes, so they
+    multiply the size of the index that the readers download. They're removed from
+    it, and a compact shard with their titles and change summaries is written next
+    to it with the script that loads it only when the readers search.
+
+    The index prebuilt by the search plugin still refers to the removed articles,
+    so it's dropped, and the search builds it again in the browser.
+
+    It does nothing if the site has no search index.
+
+    Args:
+        config: MkDocs config object.
+        working_dir: MkDocs root directory.
+        manifest: Snapshot of the newsletter directory of the build.
+        fsync: Flush the indexes to disk before replacing the old ones.
+    """
+    search_dir = os.path.join(working_dir, config.get("site_dir", "site"), "search")
+    index_path = os.path.join(search_dir, "search_index.json")
+    try:
+        with open(index_path, "r", encoding="utf-8") as index_file:
+            search_index = json.load(index_file)
+    except FileNotFoundError:
+        return
+
+    article_urls = {
+        f"newsletter/{posixpath.splitext(file_path)[0]}/"
+        for file_path in manifest.articles
+    }
+    search_index["docs"] = [
+        doc
+        for doc in search_index["docs"]
+        if doc["location"].split("#")[0] not in article_urls
+    ]
+    search_index.pop("index", None)
+    shard = {
+        "config": search_index.get("config", {}),
+        "docs": _newsletter_search_docs(
+            os.path.join(working_dir, "docs/newsletter"), manifest
+        ),
+    }
+
+    with FileBatch(fsync) as batch:
+        batch.write(index_path, _compact_json(search_index))
+        batch.write(os.path.join(search_dir, SHARD_FILE), _compact_json(shard))
+        with open(LOADER_PATH, "r", encoding="utf-8") as loader_file:
+            batch.write(os.path.join(search_dir, LOADER_FILE), loader_file.read())
+
+
+def _newsletter_search_docs(
+    newsletter_dir: str, manifest: NewsletterManifest
+) -> List[Dict[str, str]]:
+    """Build the search entries of the newsletter articles.
+
+    Each article has a single entry with its title and the titles of its sections
+    and changes, read from the markdown source.
+
+    Args:
+        newsletter_dir: Directory containing the newsletter articles.
+        manifest: Snapshot of the newsletter directory of the build.
+
+    Returns:
+        The search entries, newest first.
+    """
+    docs = []
+    for file_path, entry in sorted(
+        manifest.articles.items(), key=lambda item: item[1].date, reverse=True
+    ):
+        try:
+            with open(
+                os.path.join(newsletter_dir, file_path), "r", encoding="utf-8"
+            ) as article_file:
+                summaries = _change_summaries(article_file.read())
+        except FileNotFoundError:
+            continue
+        docs.append(
+            {
+                "location": f"newsletter/{posixpath.splitext(file_path)[0]}/",
+                "title": entry.title,
+                "text": "\n".join(summaries),
+            }
+        )
+    return docs
+
+
+def _change_summaries(article: str) -> List[str]:
+    """Extract the section titles and change summaries of a newsletter article.
+
+    The change descriptions are indented below their summary, so they're skipped.
+
+    Args:
+        article: Markdown source of the article.
+    """
+    summaries = []
+    for match in re.finditer(r"^(?:#+|\*) (.*)$", article, re.MULTILINE):
+        # Keep the text of the links
+        summaries.append(re.sub(r"\[([^\]]*)\]\([^)]*\)", r"\1", match.group(1)))
+    return summaries
+
+
+def _compact_json(data: Any) -> str:
+    """Serialize the data to JSON without whitespace."""
+    return json.dumps(data, separators=(",", ":"))
@@ -2,12 +2,14 @@
 
 import re
 from datetime import datetime
+from pathlib import Path
 
 import feedparser
 import pytest
 from dateutil import parser, tz
 from git import Repo
 from mkdocs.commands import build
+from mkdocs.config.base import load_config
 from mkdocs.config.defaults import MkDocsConfig
 
 from mkdocs_newsletter.version import __version__
@@ -42,6 +44,25 @@ def test_plugin_builds_newsletters(full_repo: Repo, config: MkDocsConfig) -> Non
     )
 
 
+def test_plugin_regenerates_newsletters(full_repo: Repo, config: MkDocsConfig) -> None:
+    """
+    Given: A built site whose oldest daily newsletter was removed.
+    When: the site is built again in regenerate mode
+    Then: The removed newsletter is created again.
+    """
+    build.build(config)
+    newsletter_path = Path(f"{full_repo.working_dir}/docs/newsletter/2021_02_02.md")
+    newsletter = newsletter_path.read_text(encoding="utf-8")
+    newsletter_path.unlink()
+    config = load_config(f"{full_repo.working_dir}/mkdocs.yml")
+    config["site_dir"] = f"{full_repo.working_dir}/site"
+    config["plugins"]["mkdocs-newsletter"].config["regenerate"] = True
+
+    build.build(config)  # act
+
+    assert newsletter_path.read_text(encoding="utf-8") == newsletter
+
+
 @pytest.mark.freeze_time("2022-04-10T12:00:00")
 def test_plugin_creates_daily_rss_feed(full_repo: Repo, config: MkDocsConfig) -> None:
     """
@@ -0,0 +1,154 @@
+"""Test the atomic writes of the generated files."""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from mkdocs_newsletter.adapters.files import FileBatch, FileWrite, write_if_changed
+
+
+def test_file_batch_replaces_the_files_on_commit(tmp_path: Path) -> None:
+    """
+    Given: An existing file and a batch that writes it and a new one.
+    When: The batch is committed.
+    Then: Both files have the new content and no temporary file is left.
+    """
+    existing = tmp_path / "existing.md"
+    existing.write_text("old content")
+    new = tmp_path / "new.md"
+
+    with FileBatch(fsync=True) as batch:
+        batch.write(str(existing), "new content")
+        batch.write(str(new), "new file")
+        assert existing.read_text() == "old content"
+
+    assert existing.read_text() == "new content"
+    assert new.read_text() == "new file"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "existing.md",
+        "new.md",
+    ]
+
+
+def test_file_batch_removes_the_temporary_files_on_error(tmp_path: Path) -> None:
+    """
+    Given: An existing file and a batch that writes it.
+    When: The batch fails before it's committed.
+    Then: The file keeps its content and no temporary file is left.
+    """
+    existing = tmp_path / "existing.md"
+    existing.write_text("old content")
+
+    with pytest.raises(ValueError, match="Render failed"):
+        with FileBatch() as batch:
+            batch.write(str(existing), "new content")
+            raise ValueError("Render failed")
+
+    assert existing.read_text() == "old content"
+    assert list(tmp_path.iterdir()) == [existing]
+
+
+def test_file_batch_removes_the_uncommitted_files_when_a_replace_fails(
+    tmp_path: Path,
+) -> None:
+    """
+    Given: A batch that writes two files, the second one to a path that is now a
+        directory.
+    When: The batch is committed.
+    Then: The first file is replaced, the error is raised and no temporary file is
+        left.
+    """
+    first = tmp_path / "first.md"
+    second = tmp_path / "second.md"
+
+    with pytest.raises(OSError):
+        with FileBatch() as batch:
+            batch.write(str(first), "first file")
+            batch.write(str(second), "second file")
+            (second / "page").mkdir(parents=True)
+
+    assert first.read_text() == "first file"
+    assert sorted(path.name for path in tmp_path.iterdir()) == [
+        "first.md",
+        "second.md",
+    ]
+    assert not batch.pending
+
+
+def test_file_batch_keeps_the_file_modes(tmp_path: Path) -> None:
+    """
+    Given: An existing file with a custom mode and a batch that writes it and a new
+        one.
+    When: The batch is committed.
+    Then: The existing file keeps its mode and the new one has the default mode
+        instead of the private mode of the temporary files.
+    """
+    existing = tmp_path / "existing.md"
+    existing.write_text("old content")
+    os.chmod(existing, 0o640)
+    new = tmp_path / "new.md"
+
+    with FileBatch() as batch:
+        batch.write(str(existing), "new content")
+        batch.write(str(new), "new file")
+
+    assert existing.stat().st_mode & 0o7777 == 0o640
+    assert new.stat().st_mode & 0o7777 == 0o666 & ~_umask()
+
+
+def test_file_batch_writes_only_the_changed_files(tmp_path: Path) -> None:
+    """
+    Given: A file with some content.
+    When: A batch writes the same content to it and other content to a new file.
+    Then: Only the new file is added to the batch.
+    """
+    existing = tmp_path / "existing.md"
+    existing.write_text("content")
+    new = tmp_path / "new.md"
+
+    with FileBatch() as batch:
+        result = [
+            batch.write_if_changed(str(existing), "content"),
+            batch.write_if_changed(str(new), "new file"),
+        ]
+        assert [path for _, path in batch.pending] == [str(new)]
+
+    assert result == [False, True]
+    assert new.read_text() == "new file"
+
+
+def test_write_if_changed_leaves_the_unchanged_and_edited_files(
+    tmp_path: Path,
+) -> None:
+    """
+    Given: A file with the content last generated for it, and a file edited by hand.
+    When: write_if_changed is called with the same content for both.
+    Then: The directory is not touched, so the file watchers don't see any event,
+        and the edited file is reported as such.
+    """
+    digest = hashlib.sha256(b"content").hexdigest()
+    unchanged = tmp_path / "unchanged.md"
+    unchanged.write_text("content")
+    edited = tmp_path / "edited.md"
+    edited.write_text("content edited by hand")
+    directory_mtime = os.stat(tmp_path).st_mtime_ns
+
+    result = [
+        write_if_changed(str(path), ["con", "tent"], digest)
+        for path in (unchanged, edited)
+    ]
+
+    assert result == [
+        FileWrite(temporary_path=None, digest=digest),
+        FileWrite(temporary_path=None, digest=digest, edited=True),
+    ]
+    assert os.stat(tmp_path).st_mtime_ns == directory_mtime
+
+
+def _umask() -> int:
+    """Return the umask of the process."""
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
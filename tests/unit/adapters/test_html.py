@@ -0,0 +1,149 @@
+"""Test the extraction of the articles from the built pages."""
+
+import time
+from pathlib import Path
+
+import pytest
+from bs4 import BeautifulSoup
+
+from mkdocs_newsletter.adapters.html import (
+    ARTICLE_BEGIN,
+    ARTICLE_END,
+    PARSERS,
+    default_parser,
+    parse_article,
+    read_article,
+    remove_article_markers,
+)
+
+ARTICLE = (
+    '<article class="md-content__inner md-typeset">'
+    "<h1>8th February 2021</h1>"
+    f"{ARTICLE_BEGIN}\n"
+    '<h2 id="introduction">Introduction'
+    '<a class="headerlink" href="#introduction">¶</a></h2>'
+    "<ul><li>New: Create the introduction page.</li></ul>"
+    f"{ARTICLE_END}\n"
+    '<div class="md-source-file"><small>Last update: '
+    '<span class="timeago" datetime="2021-02-08T10:00:00+00:00"></span>'
+    "</small></div>"
+    "</article>"
+)
+
+
+def material_page(nav_items: int, article: str = ARTICLE) -> str:
+    """Build a page with the size and structure of a material theme page.
+
+    Args:
+        nav_items: Number of entries of the site navigation.
+        article: Article element of the page.
+    """
+    nav = "".join(
+        f'<li class="md-nav__item"><a href="../page_{item}/" class="md-nav__link">'
+        f'<span class="md-ellipsis">Page {item}</span></a></li>'
+        for item in range(nav_items)
+    )
+    return (
+        "<!doctype html><html><head><title>8th February 2021</title></head><body>"
+        f'<nav class="md-nav"><ul class="md-nav__list">{nav}</ul></nav>'
+        f'<div class="md-content">{article}</div></body></html>'
+    )
+
+
+@pytest.mark.parametrize("parser", ["html.parser", None])
+def test_parse_article_keeps_only_the_article(parser: str) -> None:
+    """
+    Given: A built page with the site navigation and a newsletter article.
+    When: parse_article is called.
+    Then: Only the article is parsed, with its title, timeago span and permalinks.
+    """
+    html = material_page(10)
+
+    result = parse_article(html, parser)
+
+    assert result.find("nav") is None
+    assert result.article is not None
+    assert result.article.h1 is not None
+    assert result.article.h1.text == "8th February 2021"
+    timeago = result.find("span", {"class": "timeago"})
+    assert timeago is not None
+    assert timeago["datetime"] == "2021-02-08T10:00:00+00:00"
+    assert len(result.article.find_all("a", {"class": "headerlink"})) == 1
+
+
+def test_default_parser_is_a_supported_parser() -> None:
+    """
+    Given: The parsers installed in the environment.
+    When: default_parser is called.
+    Then: It returns one of the supported parsers.
+    """
+    result = default_parser()
+
+    assert result in PARSERS
+
+
+@pytest.mark.parametrize(
+    "article", [ARTICLE, ARTICLE.replace(ARTICLE_BEGIN, "")], ids=["sliced", "whole"]
+)
+def test_read_article_reads_the_article_of_the_page(
+    tmp_path: Path, article: str
+) -> None:
+    """
+    Given: A built page with a newsletter article with or without markers.
+    When: read_article is called.
+    Then: The article is parsed, and the markers are removed afterwards.
+    """
+    page_path = tmp_path / "index.html"
+    page_path.write_text(material_page(10, article), encoding="utf-8")
+
+    result = read_article(str(page_path))
+
+    assert result.article is not None
+    assert result.article.h1 is not None
+    assert result.article.h1.text == "8th February 2021"
+    assert result.find("span", {"class": "timeago"}) is not None
+    remove_article_markers(result.article)
+    assert "mkdocs-newsletter" not in str(result)
+
+
+@pytest.mark.benchmark
+def test_read_article_reads_a_fraction_of_the_page(tmp_path: Path) -> None:
+    """
+    Given: A built page of 500KB, most of it the site navigation, with the article
+        markers.
+    When: read_article is called.
+    Then: It takes less than a tenth of the time of parsing the whole page.
+    """
+    page_path = tmp_path / "index.html"
+    page_path.write_text(material_page(4000), encoding="utf-8")
+    html = page_path.read_text(encoding="utf-8")
+    start = time.perf_counter()
+    for _ in range(5):
+        BeautifulSoup(html, "html.parser")
+    full_parse_time = time.perf_counter() - start
+    start = time.perf_counter()
+
+    for _ in range(5):
+        read_article(str(page_path))
+
+    assert time.perf_counter() - start < full_parse_time / 10
+
+
+@pytest.mark.benchmark
+def test_parse_article_is_faster_than_parsing_the_whole_page() -> None:
+    """
+    Given: A built page of 500KB, most of it the site navigation.
+    When: parse_article is called.
+    Then: It takes less time than parsing the whole page with the html.parser.
+    """
+    html = material_page(4000)
+    start = time.perf_counter()
+    for _ in range(5):
+        BeautifulSoup(html, "html.parser")
+    full_parse_time = time.perf_counter() - start
+    start = time.perf_counter()
+
+    for _ in range(5):
+        parse_article(html)
+
+    assert time.perf_counter() - start < full_parse_time
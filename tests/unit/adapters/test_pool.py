@@ -0,0 +1,59 @@
+"""Test the pool of workers that runs the independent tasks."""
+
+from functools import partial
+
+import pytest
+
+from mkdocs_newsletter.adapters.pool import run_pool
+
+# State of each process worker set by its initializer
+worker_state = {"prefix": ""}
+
+
+def _set_prefix(prefix: str) -> None:
+    """Set the prefix of the results of a worker."""
+    worker_state["prefix"] = prefix
+
+
+def _add_prefix(text: str) -> str:
+    """Return the text with the prefix of the worker."""
+    return worker_state["prefix"] + text
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_run_pool_returns_the_results_in_order(executor: str) -> None:
+    """
+    Given: A function and the arguments of several calls.
+    When: run_pool is called with two workers.
+    Then: The futures have the result of each call in the order of the arguments.
+    """
+    args = [(number,) for number in range(5)]
+
+    result = run_pool(abs, args, 2, executor)
+
+    assert [future.result() for future in result] == [0, 1, 2, 3, 4]
+
+
+def test_run_pool_initializes_the_process_workers() -> None:
+    """
+    Given: A function that depends on the state of the worker, and an initializer
+        that sets it.
+    When: run_pool is called with two process workers.
+    Then: The calls see the state set by the initializer.
+    """
+    args = [("a",), ("b",)]
+
+    result = run_pool(_add_prefix, args, 2, "process", partial(_set_prefix, "worker_"))
+
+    assert [future.result() for future in result] == ["worker_a", "worker_b"]
+    assert not worker_state["prefix"]
+
+
+def test_run_pool_rejects_unknown_executors() -> None:
+    """
+    Given: An executor that is not supported.
+    When: run_pool is called.
+    Then: A ValueError is raised.
+    """
+    with pytest.raises(ValueError, match="Unknown executor fiber"):
+        run_pool(abs, [(1,), (2,)], 2, "fiber")
@@ -0,0 +1,114 @@
+"""Test the shared Jinja2 environment."""
+
+from pathlib import Path
+
+from jinja2 import ModuleLoader
+
+from mkdocs_newsletter.adapters.templates import (
+    DIGEST_FILE,
+    _build_loader,
+    compile_templates,
+    configure_templates,
+    get_environment,
+    get_template,
+    set_bytecode_cache,
+    set_templates_dir,
+)
+
+
+# AAA01: No act block
+def test_get_template_compiles_templates_once() -> None:  # noqa: AAA01
+    """
+    Given: The shared Jinja2 environment.
+    When: The same template is requested twice.
+    Then: The same compiled template is returned.
+    """
+    assert get_template("rss.xml.j2") is get_template("rss.xml.j2")
+    assert get_environment() is get_environment()
+
+
+def test_set_bytecode_cache_stores_compiled_templates(tmp_path: Path) -> None:
+    """
+    Given: A directory to store the template bytecode cache.
+    When: A template is compiled.
+    Then: The compiled template is stored in the directory.
+    """
+    cache_dir = tmp_path / "templates"
+    set_bytecode_cache(str(cache_dir))
+    get_environment().cache.clear()  # type: ignore
+
+    try:
+        get_template("newsletter_landing_page.j2")  # act
+    finally:
+        set_bytecode_cache(None)
+
+    assert len(list(cache_dir.iterdir())) == 1
+
+
+def test_compiled_templates_render_like_the_source_ones(tmp_path: Path) -> None:
+    """
+    Given: The package templates compiled to python modules.
+    When: A template is loaded.
+    Then: It's loaded from the compiled modules and it renders the same text as the
+        source template.
+    """
+    compile_templates(str(tmp_path))
+    loader = _build_loader(compiled_dir=str(tmp_path))
+    environment = get_environment().overlay(loader=loader)
+
+    result = environment.get_template("newsletter_landing_page.j2")
+
+    assert isinstance(loader.loaders[0], ModuleLoader)
+    assert result.render(site_url="https://example.com", feeds=["daily"]) == (
+        get_template("newsletter_landing_page.j2").render(
+            site_url="https://example.com", feeds=["daily"]
+        )
+    )
+
+
+def test_outdated_compiled_templates_are_ignored(tmp_path: Path) -> None:
+    """
+    Given: Compiled templates built from other source templates.
+    When: The templates loader is built.
+    Then: The compiled templates are not used.
+    """
+    compile_templates(str(tmp_path))
+    (tmp_path / DIGEST_FILE).write_text("outdated", encoding="utf-8")
+
+    result = _build_loader(compiled_dir=str(tmp_path))
+
+    assert not any(isinstance(loader, ModuleLoader) for loader in result.loaders)
+
+
+def test_set_templates_dir_overrides_the_package_templates(tmp_path: Path) -> None:
+    """
+    Given: A directory with a template that overrides one of the package.
+    When: The template is requested.
+    Then: The template of the directory is returned, and the rest of the templates
+        are still available.
+    """
+    (tmp_path / "rss.xml.j2").write_text("Custom feed", encoding="utf-8")
+    set_templates_dir(str(tmp_path))
+
+    try:
+        result = get_template("rss.xml.j2")
+        assert get_template("newsletter_article.j2") is not None
+    finally:
+        set_templates_dir(None)
+
+    assert result.render() == "Custom feed"
+
+
+def test_configure_templates_resets_the_removed_options(tmp_path: Path) -> None:
+    """
+    Given: A templates directory and a bytecode cache set in a previous build.
+    When: configure_templates is called without them.
+    Then: The package templates are used and the bytecode cache is removed.
+    """
+    (tmp_path / "rss.xml.j2").write_text("Custom feed", encoding="utf-8")
+    configure_templates(str(tmp_path), str(tmp_path))
+
+    configure_templates()  # act
+
+    assert get_template("rss.xml.j2").filename != str(tmp_path / "rss.xml.j2")
+    assert get_environment().bytecode_cache is None
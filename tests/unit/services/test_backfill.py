@@ -0,0 +1,54 @@
+"""Test the creation of the newsletters of a long history."""
+
+import os
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+from git import Repo
+
+from mkdocs_newsletter import Change, digital_garden_changes
+from mkdocs_newsletter.model import BuildStats, NewsletterOptions
+from mkdocs_newsletter.services.newsletter import backfill_newsletters, get_periods
+
+
+@pytest.mark.freeze_time("2022-03-01")
+def test_backfill_newsletters_creates_the_articles_by_year(
+    repo: Repo, caplog: pytest.LogCaptureFixture
+) -> None:
+    """
+    Given: Changes to publish in the daily and yearly feeds of two different years.
+    When: backfill_newsletters is called.
+    Then: The articles of both years are created and the progress of each year is
+        logged.
+    """
+    changes = [
+        Change(
+            date=datetime(year, 2, 8, tzinfo=tz.tzlocal()),
+            summary="Create the introduction page",
+            type_="feature",
+            scope="index",
+            category="Introduction",
+            category_order=0,
+            file_="index.md",
+        )
+        for year in (2021, 2020)
+    ]
+    periods = get_periods(["daily", "yearly"])
+    changes_to_publish = digital_garden_changes(changes, periods=periods)
+    stats = BuildStats()
+    caplog.set_level("INFO")
+
+    result = backfill_newsletters(
+        changes_to_publish, repo, NewsletterOptions(periods=periods), stats
+    )
+
+    assert [os.path.basename(path) for path in result] == [
+        "2020_02_08.md",
+        "2020.md",
+        "2021_02_08.md",
+        "2021.md",
+    ]
+    assert stats == BuildStats(written=4)
+    assert "Newsletter backfill: 2020 done, 1/2 changes" in caplog.text
+    assert "Newsletter backfill: 2021 done, 2/2 changes" in caplog.text
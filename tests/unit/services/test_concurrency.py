@@ -0,0 +1,62 @@
+"""Test the creation of the newsletters by a pool of workers."""
+
+from datetime import datetime
+from textwrap import dedent
+
+import pytest
+from dateutil import tz
+from git import Repo
+
+from mkdocs_newsletter import Change
+from mkdocs_newsletter.model import BuildStats, DigitalGardenChanges, NewsletterOptions
+from mkdocs_newsletter.services.newsletter import create_newsletters
+
+from .test_last_newsletters import article
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_create_newsletter_renders_articles_concurrently(
+    repo: Repo, executor: str
+) -> None:
+    """
+    Given: changes of different days to publish in the daily and weekly feeds.
+    When: create_newsletters is called with a pool of workers.
+    Then: The articles are created and returned in the same order as when they're
+        created sequentially.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, 2, day, tzinfo=tz.tzlocal()),
+            summary=f"Create the {day}th introduction page",
+            type_="feature",
+            scope="index",
+            category="Introduction",
+            category_order=0,
+            file_="index.md",
+        )
+        for day in range(12, 4, -1)
+    ]
+    changes_to_publish = DigitalGardenChanges(daily=changes, weekly=changes)
+    stats = BuildStats()
+
+    result = create_newsletters(
+        changes_to_publish,
+        repo,
+        NewsletterOptions(workers=2, executor=executor),
+        stats,
+    )
+
+    newsletter_dir = f"{repo.working_dir}/docs/newsletter"
+    assert result == [
+        f"{newsletter_dir}/2021_02_{day:02}.md" for day in range(12, 4, -1)
+    ] + [f"{newsletter_dir}/2021_w06.md", f"{newsletter_dir}/2021_w05.md"]
+    assert stats == BuildStats(written=10, unchanged=0)
+    with open(f"{newsletter_dir}/2021_02_07.md", encoding="utf-8") as file_descriptor:
+        assert file_descriptor.read() == article(
+            dedent(
+                """\
+            # [Introduction](index.md)
+
+            * New: Create the 7th introduction page"""
+            )
+        )
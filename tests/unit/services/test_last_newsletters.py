@@ -12,13 +12,30 @@ from git import Repo
 from mkdocs.config.defaults import MkDocsConfig
 
 from mkdocs_newsletter import Change, digital_garden_changes, last_newsletter_changes
-from mkdocs_newsletter.model import DigitalGardenChanges, LastNewsletter
+from mkdocs_newsletter.adapters.html import ARTICLE_BEGIN, ARTICLE_END
+from mkdocs_newsletter.model import (
+    BuildStats,
+    DigitalGardenChanges,
+    LastNewsletter,
+    NewsletterOptions,
+)
+from mkdocs_newsletter.services.manifest import load_manifest
 from mkdocs_newsletter.services.newsletter import (
     add_change_categories,
     create_newsletters,
+    get_periods,
 )
 
 
+def article(content: str) -> str:
+    """Surround the content of a newsletter article with the article markers.
+
+    Args:
+        content: Markdown of the article sections.
+    """
+    return f"{ARTICLE_BEGIN}\n\n{content}\n\n{ARTICLE_END}"
+
+
 def create_files(file_paths: List[str], repo: Repo) -> str:
     """Create the Files object with the desired files.
 
@@ -34,6 +51,7 @@ def create_files(file_paths: List[str], repo: Repo) -> str:
         os.makedirs(newsletter_dir)
 
     for file_path in file_paths:
+        os.makedirs(os.path.dirname(f"{newsletter_dir}/{file_path}"), exist_ok=True)
         Path(f"{newsletter_dir}/{file_path}").touch()
 
     return newsletter_dir
@@ -96,7 +114,36 @@ def test_last_newsletters_extracts_last_week(repo: Repo) -> None:
 
     result = last_newsletter_changes(newsletter_dir)
 
-    assert result.weekly == datetime(2020, 1, 13, tzinfo=tz.tzlocal())
+    assert result.weekly == datetime(2020, 1, 20, tzinfo=tz.tzlocal())
+
+
+def test_last_newsletters_extracts_last_quarter(repo: Repo) -> None:
+    """
+    Given: A Files object with two File objects newsletter/2020_q3.md and
+        newsletter/2020_q4.md, and the quarterly feed enabled.
+    When: last_newsletters is called
+    Then: A LastNewsletter object is returned that returns a datetime object with
+        2021-01-01 as last date for the quarter periodicity.
+    """
+    newsletter_dir = create_files(["2020_q3.md", "2020_q4.md"], repo)
+
+    result = last_newsletter_changes(newsletter_dir, get_periods(["quarterly"]))
+
+    assert result.quarterly == datetime(2021, 1, 1, tzinfo=tz.tzlocal())
+
+
+def test_last_newsletters_ignores_disabled_feeds(repo: Repo) -> None:
+    """
+    Given: A Files object with a daily and a monthly newsletter.
+    When: last_newsletters is called with only the monthly feed enabled.
+    Then: The daily feed has no last date.
+    """
+    newsletter_dir = create_files(["2020_01_01.md", "2020_01.md"], repo)
+
+    result = last_newsletter_changes(newsletter_dir, get_periods(["monthly"]))
+
+    assert result.daily is None
+    assert result.monthly == datetime(2020, 2, 1, tzinfo=tz.tzlocal())
 
 
 def test_last_newsletters_extracts_last_day(repo: Repo) -> None:
@@ -279,6 +326,46 @@ def test_digital_garden_changes_dont_select_last_year_published_changes() -> Non
     assert result.yearly == []
 
 
+@pytest.mark.freeze_time("2021-04-10T12:00:00")
+def test_digital_garden_changes_to_publish_selects_last_quarter_changes() -> None:
+    """
+    Given: A mkdocs git repo with changes done in the last and the current quarters,
+        and only the quarterly feed enabled.
+    When: changes_to_publish is called.
+    Then: Only last quarter changes are selected to be published, and no other feed
+        gets changes.
+    """
+    last_quarter_change = Change(
+        date=datetime(2021, 3, 2, tzinfo=tz.tzlocal()),
+        summary="Add funny emojis.",
+        type_="feature",
+        scope=None,
+    )
+    this_quarter_change = Change(
+        date=datetime(2021, 4, 8, tzinfo=tz.tzlocal()),
+        summary="Add ash, birch and beech information.",
+        type_="feature",
+        scope="botany",
+    )
+    changes = [last_quarter_change, this_quarter_change]
+
+    result = digital_garden_changes(changes, periods=get_periods(["quarterly"]))
+
+    assert result.quarterly == [last_quarter_change]
+    assert result.daily == []
+    assert result.monthly == []
+
+
+def test_get_periods_rejects_unknown_feeds() -> None:
+    """
+    Given: A feed name that is not a newsletter type.
+    When: get_periods is called.
+    Then: A ValueError is raised.
+    """
+    with pytest.raises(ValueError, match="Unknown newsletter feed"):
+        get_periods(["hourly"])
+
+
 @pytest.mark.parametrize("change_type", ["chore", "style"])
 def test_digital_garden_ignores_other_change_types(change_type: str) -> None:
     """
@@ -535,7 +622,7 @@ def test_create_newsletter_creates_daily_article(repo: Repo) -> None:
         os.path.join(str(repo.working_dir), "docs/newsletter/2021_02_08.md"),
         encoding="utf-8",
     ) as file_descriptor:
-        assert file_descriptor.read() == file_content
+        assert file_descriptor.read() == article(file_content)
 
 
 def test_create_newsletter_creates_weekly_articles(repo: Repo) -> None:
@@ -569,7 +656,7 @@ def test_create_newsletter_creates_weekly_articles(repo: Repo) -> None:
         os.path.join(str(repo.working_dir), "docs/newsletter/2021_w06.md"),
         encoding="utf-8",
     ) as file_descriptor:
-        assert file_descriptor.read() == file_content
+        assert file_descriptor.read() == article(file_content)
 
 
 def test_create_newsletter_creates_monthly_articles(repo: Repo) -> None:
@@ -603,7 +690,7 @@ def test_create_newsletter_creates_monthly_articles(repo: Repo) -> None:
         os.path.join(str(repo.working_dir), "docs/newsletter/2021_02.md"),
         encoding="utf-8",
     ) as file_descriptor:
-        assert file_descriptor.read() == file_content
+        assert file_descriptor.read() == article(file_content)
 
 
 def test_create_newsletter_creates_yearly_articles(repo: Repo) -> None:
@@ -636,4 +723,257 @@ def test_create_newsletter_creates_yearly_articles(repo: Repo) -> None:
     with open(
         os.path.join(str(repo.working_dir), "docs/newsletter/2021.md"), encoding="utf-8"
     ) as file_descriptor:
-        assert file_descriptor.read() == file_content
+        assert file_descriptor.read() == article(file_content)
+
+
+def test_create_newsletter_creates_quarterly_articles(repo: Repo) -> None:
+    """
+    Given: a change to publish in the quarterly summary.
+    When: create_newsletters is called with the quarterly feed enabled.
+    Then: The file is created and a File object is returned.
+    """
+    desired_file = f"{repo.working_dir}/docs/newsletter/2021_q1.md"
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes_to_publish = DigitalGardenChanges(quarterly=[change])
+
+    result = create_newsletters(
+        changes_to_publish,
+        repo,
+        NewsletterOptions(periods=get_periods(["quarterly"])),
+    )
+
+    assert result == [desired_file]
+
+
+def test_create_newsletter_rolls_up_daily_sections(repo: Repo) -> None:
+    """
+    Given: changes of two days of the same file and category to publish in the daily
+        and monthly feeds.
+    When: create_newsletters is called
+    Then: The monthly article merges the sections of both days, and the daily
+        articles are not affected by the merge.
+    """
+    first_change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    second_change = Change(
+        date=datetime(2021, 2, 9, tzinfo=tz.tzlocal()),
+        summary="Improve the introduction page",
+        type_="performance",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes = [second_change, first_change]
+    changes_to_publish = DigitalGardenChanges(daily=changes, monthly=changes)
+
+    create_newsletters(changes_to_publish, repo)  # act
+
+    newsletter_dir = os.path.join(str(repo.working_dir), "docs/newsletter")
+    with open(f"{newsletter_dir}/2021_02.md", encoding="utf-8") as file_descriptor:
+        assert file_descriptor.read() == article(
+            dedent(
+                """\
+            # [Introduction](index.md)
+
+            * New: Create the introduction page
+            * Improvement: Improve the introduction page"""
+            )
+        )
+    with open(f"{newsletter_dir}/2021_02_08.md", encoding="utf-8") as file_descriptor:
+        assert file_descriptor.read() == article(
+            dedent(
+                """\
+            # [Introduction](index.md)
+
+            * New: Create the introduction page"""
+            )
+        )
+
+
+def test_create_newsletter_doesnt_rewrite_unchanged_articles(repo: Repo) -> None:
+    """
+    Given: a daily article that was already created with the same changes.
+    When: create_newsletters is called again.
+    Then: The file is not written again and the build stats count it as unchanged.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes_to_publish = DigitalGardenChanges(daily=[change])
+    newsletter_path = create_newsletters(changes_to_publish, repo)[0]
+    os.utime(newsletter_path, (0, 0))
+    stats = BuildStats()
+
+    result = create_newsletters(changes_to_publish, repo, stats=stats)
+
+    assert result == [newsletter_path]
+    assert os.path.getmtime(newsletter_path) == 0
+    assert stats == BuildStats(written=0, unchanged=1)
+
+
+def test_create_newsletter_leaves_only_the_articles(repo: Repo) -> None:
+    """
+    Given: Changes to publish in the daily and weekly feeds.
+    When: create_newsletters is called with fsync enabled.
+    Then: The temporary files of the articles are renamed to the article files and
+        their digests are stored in the manifest.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes_to_publish = DigitalGardenChanges(daily=[change], weekly=[change])
+
+    result = create_newsletters(changes_to_publish, repo, NewsletterOptions(fsync=True))
+
+    newsletter_dir = os.path.dirname(result[0])
+    assert sorted(os.listdir(newsletter_dir)) == [
+        ".manifest.json",
+        "2021_02_08.md",
+        "2021_w06.md",
+    ]
+    assert sorted(load_manifest(newsletter_dir).articles) == [
+        "2021_02_08.md",
+        "2021_w06.md",
+    ]
+
+
+def test_create_newsletter_doesnt_overwrite_edited_articles(repo: Repo) -> None:
+    """
+    Given: a daily article that was edited by hand after it was created.
+    When: create_newsletters is called again with other changes.
+    Then: The article keeps the manual edits and the build stats count it as edited.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    newsletter_path = create_newsletters(DigitalGardenChanges(daily=[change]), repo)[0]
+    with open(newsletter_path, "a", encoding="utf-8") as newsletter_file:
+        newsletter_file.write("\n\nManual note.")
+    edited_content = Path(newsletter_path).read_text(encoding="utf-8")
+    change.summary = "Create the index page"
+    stats = BuildStats()
+
+    result = create_newsletters(DigitalGardenChanges(daily=[change]), repo, stats=stats)
+
+    assert result == [newsletter_path]
+    assert Path(newsletter_path).read_text(encoding="utf-8") == edited_content
+    assert stats == BuildStats(written=0, unchanged=0, edited=1)
+
+
+def test_create_newsletter_keeps_the_descriptions_in_the_finest_feed(
+    repo: Repo,
+) -> None:
+    """
+    Given: Three changes with descriptions of the same type and file, published in
+        the daily and monthly feeds.
+    When: create_newsletters is called with a merge threshold of 2.
+    Then: The changes are merged in the monthly article, and the daily article
+        keeps their descriptions.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+            summary=f"Change {index}",
+            message=f"Long description {index}",
+            type_="feature",
+            scope="index",
+            category="Introduction",
+            category_order=0,
+            file_="index.md",
+        )
+        for index in range(3)
+    ]
+    changes_to_publish = DigitalGardenChanges(daily=changes, monthly=changes)
+
+    result = create_newsletters(
+        changes_to_publish,
+        repo,
+        NewsletterOptions(periods=get_periods(["daily", "monthly"]), merge_threshold=2),
+    )
+
+    daily, monthly = [Path(path).read_text(encoding="utf-8") for path in result]
+    assert "* New: 3 changes." in monthly
+    assert "Long description" not in monthly
+    for index in range(3):
+        assert f"Long description {index}" in daily
+
+
+def test_create_newsletter_groups_interleaved_changes(repo: Repo) -> None:
+    """
+    Given: unsorted changes to publish in the weekly feed, where the changes of the
+        same week are not adjacent.
+    When: create_newsletters is called.
+    Then: Each weekly article contains all the changes of its week.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, 2, day, tzinfo=tz.tzlocal()),
+            summary=f"Create the {day}th introduction page",
+            type_="feature",
+            scope="index",
+            category="Introduction",
+            category_order=0,
+            file_="index.md",
+        )
+        for day in [8, 1, 10, 2]
+    ]
+    changes_to_publish = DigitalGardenChanges(weekly=changes)
+
+    result = create_newsletters(changes_to_publish, repo)
+
+    newsletter_dir = f"{repo.working_dir}/docs/newsletter"
+    assert result == [f"{newsletter_dir}/2021_w06.md", f"{newsletter_dir}/2021_w05.md"]
+    with open(f"{newsletter_dir}/2021_w06.md", encoding="utf-8") as file_descriptor:
+        assert file_descriptor.read() == article(
+            dedent(
+                """\
+            # [Introduction](index.md)
+
+            * New: Create the 8th introduction page
+            * New: Create the 10th introduction page"""
+            )
+        )
+    with open(f"{newsletter_dir}/2021_w05.md", encoding="utf-8") as file_descriptor:
+        assert file_descriptor.read() == article(
+            dedent(
+                """\
+            # [Introduction](index.md)
+
+            * New: Create the 1th introduction page
+            * New: Create the 2th introduction page"""
+            )
+        )
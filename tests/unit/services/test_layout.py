@@ -0,0 +1,291 @@
+"""Test the organization of the newsletter articles in the directory."""
+
+import os
+from datetime import datetime
+from pathlib import Path
+from textwrap import dedent
+
+import pytest
+from dateutil import tz
+from git import Repo
+from mkdocs.config.defaults import MkDocsConfig
+
+from mkdocs_newsletter import Change, last_newsletter_changes
+from mkdocs_newsletter.model import (
+    DigitalGardenChanges,
+    NewsletterLayout,
+    NewsletterOptions,
+)
+from mkdocs_newsletter.services.layout import (
+    compact_newsletters,
+    create_redirects,
+    migrate_layout,
+)
+from mkdocs_newsletter.services.manifest import load_manifest, save_manifest
+from mkdocs_newsletter.services.newsletter import create_newsletters, get_periods
+
+from .test_last_newsletters import create_files
+
+
+def test_create_newsletter_stores_the_articles_in_the_layout(repo: Repo) -> None:
+    """
+    Given: Changes to publish in the daily and weekly feeds.
+    When: create_newsletters is called with the month layout.
+    Then: The articles are stored in the subdirectories of the layout, and the
+        manifest indexes them by their relative path.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes_to_publish = DigitalGardenChanges(daily=[change], weekly=[change])
+    newsletter_dir = f"{repo.working_dir}/docs/newsletter"
+
+    result = create_newsletters(
+        changes_to_publish, repo, NewsletterOptions(layout=NewsletterLayout.MONTH)
+    )
+
+    assert result == [
+        f"{newsletter_dir}/2021/02/2021_02_08.md",
+        f"{newsletter_dir}/2021/2021_w06.md",
+    ]
+    manifest = load_manifest(newsletter_dir)
+    assert sorted(manifest.articles) == ["2021/02/2021_02_08.md", "2021/2021_w06.md"]
+    assert sorted(manifest.directories) == ["2021", "2021/02"]
+
+
+def test_migrate_layout_moves_the_articles(repo: Repo) -> None:
+    """
+    Given: A newsletter directory with the articles stored in the year layout.
+    When: migrate_layout is called with the flat layout.
+    Then: The articles are moved to the newsletter directory, the empty year
+        subdirectory is removed and the manifest is updated.
+    """
+    newsletter_dir = create_files(["2021/2021.md", "2021/2021_02_08.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+
+    result = migrate_layout(newsletter_dir, NewsletterLayout.FLAT, manifest)
+
+    assert result == 2
+    assert sorted(os.listdir(newsletter_dir)) == [
+        ".manifest.json",
+        "2021.md",
+        "2021_02_08.md",
+    ]
+    assert sorted(manifest.articles) == ["2021.md", "2021_02_08.md"]
+    assert load_manifest(newsletter_dir) == manifest
+
+
+def test_create_redirects_redirects_the_moved_urls(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: A flat article moved to the year layout, and an article created in it.
+    When: create_redirects is called.
+    Then: Only the flat URL of the moved article redirects to its new URL.
+    """
+    newsletter_dir = create_files(["2021.md", "2021/2021_02_09.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    migrate_layout(newsletter_dir, NewsletterLayout.YEAR, manifest)
+    config["site_dir"] = "site"
+    site_dir = f"{repo.working_dir}/site/newsletter"
+
+    create_redirects(config, str(repo.working_dir), manifest)  # act
+
+    assert os.listdir(site_dir) == ["2021"]
+    redirect = Path(f"{site_dir}/2021/index.html").read_text(encoding="utf-8")
+    assert 'content="0; url=2021/"' in redirect
+    assert load_manifest(newsletter_dir).moved == {"2021.md": "2021/2021.md"}
+
+
+def test_create_redirects_skips_the_unchanged_redirects(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: An article moved twice, whose redirect was already written.
+    When: create_redirects is called again.
+    Then: The redirect of the first path points to the last one, and the
+        unchanged redirect is not written again.
+    """
+    newsletter_dir = create_files(["2021_02_08.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    migrate_layout(newsletter_dir, NewsletterLayout.YEAR, manifest)
+    config["site_dir"] = "site"
+    create_redirects(config, str(repo.working_dir), manifest)
+    migrate_layout(newsletter_dir, NewsletterLayout.MONTH, manifest)
+    create_redirects(config, str(repo.working_dir), manifest)
+    site_dir = Path(f"{repo.working_dir}/site/newsletter")
+    redirect = site_dir / "2021_02_08" / "index.html"
+    inode = redirect.stat().st_ino
+
+    create_redirects(config, str(repo.working_dir), manifest)  # act
+
+    assert redirect.stat().st_ino == inode
+    assert 'content="0; url=../2021/02/2021_02_08/"' in redirect.read_text(
+        encoding="utf-8"
+    )
+    assert 'content="0; url=../02/2021_02_08/"' in (
+        site_dir / "2021" / "2021_02_08" / "index.html"
+    ).read_text(encoding="utf-8")
+
+
+@pytest.mark.freeze_time("2021-03-15")
+def test_compact_newsletters_removes_the_old_short_period_articles(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: Daily articles of February and March, one of them edited by hand, and the
+        monthly article of February.
+    When: compact_newsletters is called with a retention of 7 days.
+    Then: The old daily article that wasn't edited is removed, it's not created again
+        and its URL is redirected to the monthly article.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, month, day, tzinfo=tz.tzlocal()),
+            summary="Create the introduction page",
+            type_="feature",
+            scope="index",
+            category="Introduction",
+            category_order=0,
+            file_="index.md",
+        )
+        for month, day in ((2, 8), (2, 9), (3, 14))
+    ]
+    changes_to_publish = DigitalGardenChanges(daily=changes, monthly=changes[:2])
+    paths = create_newsletters(changes_to_publish, repo)
+    newsletter_dir = os.path.dirname(paths[0])
+    with open(f"{newsletter_dir}/2021_02_09.md", "a", encoding="utf-8") as file_:
+        file_.write("\n\nManual note.")
+    manifest = load_manifest(newsletter_dir)
+
+    result = compact_newsletters(newsletter_dir, manifest, 7)
+
+    assert result == 1
+    assert sorted(os.listdir(newsletter_dir)) == [
+        ".manifest.json",
+        "2021_02.md",
+        "2021_02_09.md",
+        "2021_03_14.md",
+    ]
+    assert list(load_manifest(newsletter_dir).compacted) == ["2021_02_08.md"]
+    assert last_newsletter_changes(
+        newsletter_dir, get_periods(["daily"]), manifest
+    ).daily == datetime(2021, 3, 15, tzinfo=tz.tzlocal())
+    create_newsletters(changes_to_publish, repo, manifest=manifest)
+    assert not os.path.exists(f"{newsletter_dir}/2021_02_08.md")
+    config["site_dir"] = "site"
+    create_redirects(config, str(repo.working_dir), manifest)
+    redirect = Path(f"{repo.working_dir}/site/newsletter/2021_02_08/index.html")
+    assert 'content="0; url=../2021_02/"' in redirect.read_text(encoding="utf-8")
+
+
+@pytest.mark.freeze_time("2021-02-20")
+def test_compact_newsletters_archives_the_articles_without_coarser_article(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: Old daily and weekly articles whose monthly article is not published yet.
+    When: compact_newsletters is called with a retention of 7 days.
+    Then: Their content is moved to the archive page of the month before they're
+        removed, and their URLs are redirected to it.
+    """
+    change = Change(
+        date=datetime(2021, 2, 3, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    changes_to_publish = DigitalGardenChanges(daily=[change], weekly=[change])
+    paths = create_newsletters(
+        changes_to_publish,
+        repo,
+        NewsletterOptions(periods=get_periods(["daily", "weekly"])),
+    )
+    newsletter_dir = os.path.dirname(paths[0])
+    manifest = load_manifest(newsletter_dir)
+
+    result = compact_newsletters(newsletter_dir, manifest, 7)
+
+    assert result == 2
+    assert sorted(os.listdir(newsletter_dir)) == [
+        ".manifest.json",
+        "0_compacted_2021_02.md",
+    ]
+    archive = Path(f"{newsletter_dir}/0_compacted_2021_02.md").read_text(
+        encoding="utf-8"
+    )
+    assert archive == dedent(
+        """\
+        # Archive of February of 2021
+
+        ## 5th Week of 2021
+
+        ### [Introduction](index.md)
+
+        * New: Create the introduction page
+
+        ## 3rd February 2021
+
+        ### [Introduction](index.md)
+
+        * New: Create the introduction page
+        """
+    )
+    config["site_dir"] = "site"
+    create_redirects(config, str(repo.working_dir), manifest)
+    redirect = Path(f"{repo.working_dir}/site/newsletter/2021_02_03/index.html")
+    assert 'content="0; url=../0_compacted_2021_02/"' in redirect.read_text(
+        encoding="utf-8"
+    )
+
+
+@pytest.mark.freeze_time("2021-02-20")
+def test_compact_newsletters_resumes_an_interrupted_compaction(repo: Repo) -> None:
+    """
+    Given: Old daily and weekly articles that were archived by a compaction that was
+        interrupted after it removed only the weekly one, so the manifest was not
+        saved.
+    When: compact_newsletters is called again.
+    Then: The sections are not added again to the archive page, and both articles
+        are recorded as archived.
+    """
+    change = Change(
+        date=datetime(2021, 2, 3, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    paths = create_newsletters(
+        DigitalGardenChanges(daily=[change], weekly=[change]),
+        repo,
+        NewsletterOptions(periods=get_periods(["daily", "weekly"])),
+    )
+    newsletter_dir = os.path.dirname(paths[0])
+    manifest = load_manifest(newsletter_dir)
+    daily_article = Path(paths[0]).read_text(encoding="utf-8")
+    compact_newsletters(newsletter_dir, manifest.copy(deep=True), 7)
+    archive_path = Path(f"{newsletter_dir}/0_compacted_2021_02.md")
+    archive = archive_path.read_text(encoding="utf-8")
+    Path(paths[0]).write_text(daily_article, encoding="utf-8")
+    save_manifest(newsletter_dir, manifest)
+
+    result = compact_newsletters(newsletter_dir, manifest, 7)
+
+    assert result == 2
+    assert archive_path.read_text(encoding="utf-8") == archive
+    assert manifest.archived == {
+        "2021_02_03.md": "0_compacted_2021_02.md",
+        "2021_w05.md": "0_compacted_2021_02.md",
+    }
@@ -0,0 +1,107 @@
+"""Test the manifest of the newsletter articles."""
+
+import os
+from datetime import datetime
+
+from dateutil import tz
+from git import Repo
+
+from mkdocs_newsletter import Change
+from mkdocs_newsletter.model import (
+    DigitalGardenChanges,
+    NewsletterLayout,
+    NewsletterOptions,
+)
+from mkdocs_newsletter.services.manifest import load_manifest
+from mkdocs_newsletter.services.newsletter import create_newsletters
+
+from .test_last_newsletters import create_files
+
+
+def test_load_manifest_trusts_the_manifest_of_an_unchanged_dir(repo: Repo) -> None:
+    """
+    Given: A newsletter directory whose manifest was saved after its last change.
+    When: load_manifest is called.
+    Then: The directory is not scanned and the stored manifest is returned.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    newsletter_path = create_newsletters(DigitalGardenChanges(weekly=[change]), repo)[0]
+    newsletter_dir = os.path.dirname(newsletter_path)
+    # Remove the article without changing the directory modification time
+    directory_stat = os.stat(newsletter_dir)
+    os.remove(newsletter_path)
+    os.utime(
+        newsletter_dir, ns=(directory_stat.st_atime_ns, directory_stat.st_mtime_ns)
+    )
+
+    result = load_manifest(newsletter_dir)
+
+    entry = result.articles["2021_w06.md"]
+    assert entry.type_ == "weekly"
+    assert entry.date == datetime(2021, 2, 8, tzinfo=tz.tzlocal())
+    assert entry.title == "6th Week of 2021"
+    assert entry.digest is not None
+
+
+def test_load_manifest_scans_the_changed_dir(repo: Repo) -> None:
+    """
+    Given: A newsletter directory with a file added after the manifest was saved.
+    When: load_manifest is called.
+    Then: The new file is added to the manifest and the digests of the generated
+        articles are kept.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    newsletter_path = create_newsletters(DigitalGardenChanges(weekly=[change]), repo)[0]
+    newsletter_dir = os.path.dirname(newsletter_path)
+    digest = load_manifest(newsletter_dir).articles["2021_w06.md"].digest
+    create_files(["2021_02.md"], repo)
+
+    result = load_manifest(newsletter_dir)
+
+    assert sorted(result.articles) == ["2021_02.md", "2021_w06.md"]
+    assert result.articles["2021_02.md"].digest is None
+    assert result.articles[os.path.basename(newsletter_path)].digest == digest
+
+
+def test_load_manifest_scans_the_changed_subdirectories(repo: Repo) -> None:
+    """
+    Given: A newsletter directory with a file added to a year subdirectory after the
+        manifest was saved.
+    When: load_manifest is called.
+    Then: The new file is added to the manifest.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    create_newsletters(
+        DigitalGardenChanges(weekly=[change]),
+        repo,
+        NewsletterOptions(layout=NewsletterLayout.YEAR),
+    )
+    newsletter_dir = create_files(["2021/2021_02.md"], repo)
+
+    result = load_manifest(newsletter_dir)
+
+    assert sorted(result.articles) == ["2021/2021_02.md", "2021/2021_w06.md"]
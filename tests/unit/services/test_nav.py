@@ -4,10 +4,16 @@ The sections and pages need to be defined in the `items` attribute and an ordere
 list of Pages and SectionPages need to be stored in the `pages` attribute.
 """
 
+import os
+from pathlib import Path
+
 from git import Repo
 from mkdocs.config.defaults import MkDocsConfig
 
+from mkdocs_newsletter.model import NavCache, NewsletterOptions
+from mkdocs_newsletter.services.manifest import load_manifest, save_manifest
 from mkdocs_newsletter.services.nav import build_nav
+from mkdocs_newsletter.services.newsletter import get_periods
 
 from .test_last_newsletters import create_files
 
@@ -204,3 +210,178 @@ def test_build_nav_sorts_day_entries(
             ]
         },
     ]
+
+
+def test_build_nav_nests_months_under_quarters(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: A quarter and a month file, and the quarterly feed enabled.
+    When: build_nav is called
+    Then: the month nav entry is nested under the quarter one.
+    """
+    newsletter_dir = create_files(["2021_q1.md", "2021_02.md"], repo)
+
+    result = build_nav(
+        config,
+        newsletter_dir,
+        NewsletterOptions(periods=get_periods(["quarterly", "monthly"])),
+    )
+
+    assert result["nav"][-1]["Newsletters"][0]["2021"] == [
+        {
+            "1st Quarter of 2021": [
+                "newsletter/2021_q1.md",
+                {"February of 2021": ["newsletter/2021_02.md"]},
+            ]
+        },
+    ]
+
+
+def test_build_nav_uses_the_build_snapshot(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: A snapshot of the newsletter directory taken before a file was added.
+    When: build_nav is called with the snapshot
+    Then: The nav is built from the snapshot without listing the directory again.
+    """
+    newsletter_dir = create_files(["2021.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    create_files(["2022.md"], repo)
+
+    result = build_nav(config, newsletter_dir, manifest=manifest)
+
+    assert result["nav"][-1] == {"Newsletters": [{"2021": ["newsletter/2021.md"]}]}
+
+
+def test_build_nav_uses_the_path_of_the_sharded_articles(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: Newsletter articles stored in the month layout.
+    When: build_nav is called
+    Then: The nav points to the paths of the articles inside the subdirectories.
+    """
+    newsletter_dir = create_files(["2021/2021.md", "2021/02/2021_02.md"], repo)
+
+    result = build_nav(
+        config,
+        newsletter_dir,
+        NewsletterOptions(periods=get_periods(["monthly", "yearly"])),
+    )
+
+    assert result["nav"][-1] == {
+        "Newsletters": [
+            {
+                "2021": [
+                    "newsletter/2021/2021.md",
+                    {"February of 2021": ["newsletter/2021/02/2021_02.md"]},
+                ]
+            }
+        ]
+    }
+
+
+def test_build_nav_collapses_the_years_out_of_the_window(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: Newsletters of three years.
+    When: build_nav is called with a window of two years.
+    Then: The newsletters of the oldest year are replaced by its archive page, which
+        lists them.
+    """
+    newsletter_dir = create_files(
+        ["2022.md", "2021.md", "2020.md", "2020_02.md", "0_archive_2019.md"], repo
+    )
+
+    result = build_nav(
+        config,
+        newsletter_dir,
+        NewsletterOptions(periods=get_periods(["monthly", "yearly"]), nav_window=2),
+    )
+
+    assert result["nav"][-1] == {
+        "Newsletters": [
+            {"2022": ["newsletter/2022.md"]},
+            {"2021": ["newsletter/2021.md"]},
+            {"2020": "newsletter/0_archive_2020.md"},
+        ]
+    }
+    assert not os.path.exists(f"{newsletter_dir}/0_archive_2019.md")
+    archive = Path(f"{newsletter_dir}/0_archive_2020.md").read_text(encoding="utf-8")
+    assert "* [2020](2020.md)" in archive
+    assert "* [February of 2020](2020_02.md)" in archive
+
+
+def test_build_nav_adds_the_new_articles_to_the_cached_tree(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: A nav tree stored in the manifest, and a new article created afterwards.
+    When: build_nav is called
+    Then: Only the new article is added to the stored tree, in its sorted position,
+        and the tree is stored again.
+    """
+    newsletter_dir = create_files(["2021.md", "2021_02.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    save_manifest(newsletter_dir, manifest)
+    options = NewsletterOptions(periods=get_periods(["monthly", "yearly"]))
+    build_nav(config, newsletter_dir, options, manifest)
+    manifest.nav.tree["2021"]["title"] = "Cached 2021"
+    save_manifest(newsletter_dir, manifest)
+    create_files(["2021_03.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    save_manifest(newsletter_dir, manifest)
+
+    result = build_nav(config, newsletter_dir, options, manifest)
+
+    assert result["nav"][-1] == {
+        "Newsletters": [
+            {
+                "Cached 2021": [
+                    "newsletter/2021.md",
+                    {"March of 2021": ["newsletter/2021_03.md"]},
+                    {"February of 2021": ["newsletter/2021_02.md"]},
+                ]
+            }
+        ]
+    }
+    assert load_manifest(newsletter_dir).nav.articles == [
+        "2021.md",
+        "2021_02.md",
+        "2021_03.md",
+    ]
+
+
+def test_build_nav_rebuilds_the_tree_when_an_article_is_removed(
+    repo: Repo,
+    config: MkDocsConfig,
+) -> None:
+    """
+    Given: A nav tree stored in the manifest with an article that no longer exists.
+    When: build_nav is called
+    Then: The tree is built again from the existing articles.
+    """
+    newsletter_dir = create_files(["2021.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    manifest.nav = NavCache(
+        levels=["yearly", "monthly"],
+        articles=["2020.md", "2021.md"],
+        tree={"2020": {"title": "2020", "index": "newsletter/2020.md"}},
+    )
+
+    result = build_nav(
+        config,
+        newsletter_dir,
+        NewsletterOptions(periods=get_periods(["monthly", "yearly"])),
+        manifest,
+    )
+
+    assert result["nav"][-1] == {"Newsletters": [{"2021": ["newsletter/2021.md"]}]}
@@ -0,0 +1,145 @@
+"""Test the creation of the RSS feeds."""
+
+import os
+from pathlib import Path
+
+import pytest
+from git import Repo
+from mkdocs.config.defaults import MkDocsConfig
+
+from mkdocs_newsletter.model import BuildStats, NewsletterOptions
+from mkdocs_newsletter.services.manifest import load_manifest
+from mkdocs_newsletter.services.newsletter import get_periods
+from mkdocs_newsletter.services.rss import create_rss
+
+from ..adapters.test_html import ARTICLE, material_page
+from .test_last_newsletters import create_files
+
+
+def test_create_rss_parses_only_the_changed_pages(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: Two built daily newsletters whose RSS entries were cached in a previous
+        build, and one of them was built again with another article.
+    When: create_rss is called.
+    Then: Only the changed page is parsed, and the feed has both entries.
+    """
+    newsletter_dir = create_files(["2021_02_08.md", "2021_02_09.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    config["site_dir"] = f"{repo.working_dir}/site"
+    for basename in ("2021_02_08", "2021_02_09"):
+        page_path = Path(f"{config['site_dir']}/newsletter/{basename}/index.html")
+        os.makedirs(page_path.parent)
+        page_path.write_text(material_page(10), encoding="utf-8")
+    options = NewsletterOptions(
+        periods=get_periods(["daily"]), cache_dir=f"{repo.working_dir}/.cache"
+    )
+    create_rss(config, str(repo.working_dir), options, manifest)
+    page_path.write_text(
+        material_page(10, ARTICLE.replace("introduction page", "index page")),
+        encoding="utf-8",
+    )
+    stats = BuildStats()
+
+    create_rss(config, str(repo.working_dir), options, manifest, stats)
+
+    assert stats == BuildStats(feed_entries_cached=1, feed_entries_parsed=1)
+    feed = Path(f"{config['site_dir']}/daily.xml").read_text(encoding="utf-8")
+    assert feed.count("<item>") == 2
+    assert "Create the index page" in feed
+
+
+def test_create_rss_uses_the_cache_when_only_the_nav_changes(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: A built daily newsletter whose RSS entry was cached in a previous build,
+        and it was built again with a longer site navigation, as when another
+        newsletter is published.
+    When: create_rss is called.
+    Then: The page is not parsed again.
+    """
+    newsletter_dir = create_files(["2021_02_08.md"], repo)
+    manifest = load_manifest(newsletter_dir)
+    config["site_dir"] = f"{repo.working_dir}/site"
+    page_path = Path(f"{config['site_dir']}/newsletter/2021_02_08/index.html")
+    os.makedirs(page_path.parent)
+    page_path.write_text(material_page(10), encoding="utf-8")
+    options = NewsletterOptions(
+        periods=get_periods(["daily"]), cache_dir=f"{repo.working_dir}/.cache"
+    )
+    create_rss(config, str(repo.working_dir), options, manifest)
+    page_path.write_text(material_page(11), encoding="utf-8")
+    stats = BuildStats()
+
+    create_rss(config, str(repo.working_dir), options, manifest, stats)
+
+    assert stats == BuildStats(feed_entries_cached=1)
+
+
+@pytest.mark.parametrize("executor", ["thread", "process"])
+def test_create_rss_parses_the_pages_concurrently(
+    repo: Repo, config: MkDocsConfig, executor: str
+) -> None:
+    """
+    Given: Three built daily newsletters without cached RSS entries.
+    When: create_rss is called with a pool of workers.
+    Then: All the pages are parsed, and the feed has their entries in order.
+    """
+    basenames = ["2021_02_08", "2021_02_09", "2021_02_10"]
+    newsletter_dir = create_files([f"{basename}.md" for basename in basenames], repo)
+    manifest = load_manifest(newsletter_dir)
+    config["site_dir"] = f"{repo.working_dir}/site"
+    for basename in basenames:
+        page_path = Path(f"{config['site_dir']}/newsletter/{basename}/index.html")
+        os.makedirs(page_path.parent)
+        page_path.write_text(material_page(10), encoding="utf-8")
+    stats = BuildStats()
+
+    create_rss(
+        config,
+        str(repo.working_dir),
+        NewsletterOptions(
+            periods=get_periods(["daily"]),
+            workers=2,
+            executor=executor,
+            html_parser="html.parser",
+        ),
+        manifest,
+        stats,
+    )
+
+    assert stats == BuildStats(feed_entries_parsed=3)
+    feed = Path(f"{config['site_dir']}/daily.xml").read_text(encoding="utf-8")
+    assert feed.count("<item>") == 3
+    assert (
+        feed.index("newsletter/2021_02_10/")
+        < feed.index("newsletter/2021_02_09/")
+        < feed.index("newsletter/2021_02_08/")
+    )
+
+
+def test_create_rss_rejects_unknown_executors(repo: Repo, config: MkDocsConfig) -> None:
+    """
+    Given: Two built daily newsletters.
+    When: create_rss is called with an unknown executor.
+    Then: A ValueError is raised.
+    """
+    basenames = ["2021_02_08", "2021_02_09"]
+    newsletter_dir = create_files([f"{basename}.md" for basename in basenames], repo)
+    config["site_dir"] = f"{repo.working_dir}/site"
+    for basename in basenames:
+        page_path = Path(f"{config['site_dir']}/newsletter/{basename}/index.html")
+        os.makedirs(page_path.parent)
+        page_path.write_text(material_page(10), encoding="utf-8")
+
+    with pytest.raises(ValueError, match="Unknown executor fiber"):
+        create_rss(
+            config,
+            str(repo.working_dir),
+            NewsletterOptions(
+                periods=get_periods(["daily"]), workers=2, executor="fiber"
+            ),
+            load_manifest(newsletter_dir),
+        )
@@ -0,0 +1,102 @@
+"""Test the services that build the search indexes."""
+
+import json
+import os
+from datetime import datetime
+
+import pytest
+from dateutil import tz
+from git import Repo
+from mkdocs.config.defaults import MkDocsConfig
+
+from mkdocs_newsletter import Change
+from mkdocs_newsletter.model import DigitalGardenChanges
+from mkdocs_newsletter.services.manifest import load_manifest
+from mkdocs_newsletter.services.newsletter import create_newsletters
+from mkdocs_newsletter.services.search import (
+    add_search_loader,
+    split_search_index,
+)
+
+
+def test_split_search_index_moves_the_articles_to_a_shard(
+    repo: Repo, config: MkDocsConfig
+) -> None:
+    """
+    Given: A search index with a regular page and the sections of a newsletter
+        article.
+    When: split_search_index is called.
+    Then: The article is removed from the search index and from its prebuilt
+        index, and the shard has a single entry with its title and change
+        summaries, without the descriptions, next to the script that loads it.
+    """
+    change = Change(
+        date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+        summary="Create the introduction page",
+        message="Long description of the change",
+        type_="feature",
+        scope="index",
+        category="Introduction",
+        category_order=0,
+        file_="index.md",
+    )
+    newsletter_path = create_newsletters(DigitalGardenChanges(daily=[change]), repo)[0]
+    config["site_dir"] = "site"
+    search_dir = f"{repo.working_dir}/site/search"
+    os.makedirs(search_dir)
+    page = {"location": "", "title": "Introduction", "text": "Welcome"}
+    with open(f"{search_dir}/search_index.json", "w", encoding="utf-8") as file_:
+        json.dump(
+            {
+                "config": {"lang": ["en"]},
+                "index": {"fields": {}, "invertedIndex": []},
+                "docs": [
+                    page,
+                    {
+                        "location": "newsletter/2021_02_08/",
+                        "title": "8th February 2021",
+                        "text": "",
+                    },
+                    {
+                        "location": "newsletter/2021_02_08/#introduction",
+                        "title": "Introduction",
+                        "text": "Long description of the change",
+                    },
+                ],
+            },
+            file_,
+        )
+    manifest = load_manifest(os.path.dirname(newsletter_path))
+
+    split_search_index(config, str(repo.working_dir), manifest)  # act
+
+    with open(f"{search_dir}/search_index.json", "r", encoding="utf-8") as file_:
+        assert json.load(file_) == {"config": {"lang": ["en"]}, "docs": [page]}
+    with open(f"{search_dir}/newsletter_index.json", "r", encoding="utf-8") as file_:
+        assert json.load(file_) == {
+            "config": {"lang": ["en"]},
+            "docs": [
+                {
+                    "location": "newsletter/2021_02_08/",
+                    "title": "8th February 2021",
+                    "text": "Introduction\nNew: Create the introduction page",
+                }
+            ],
+        }
+    with open(f"{search_dir}/newsletter_search.js", "r", encoding="utf-8") as file_:
+        assert "newsletter_index.json" in file_.read()
+
+
+@pytest.mark.parametrize("plugin", ["search", "material/search"])
+def test_add_search_loader_adds_the_script(config: MkDocsConfig, plugin: str) -> None:
+    """
+    Given: A site with the search plugin of mkdocs or of the material theme.
+    When: add_search_loader is called.
+    Then: The script that loads the shard is added to the extra javascript.
+    """
+    config["plugins"] = {plugin: None}
+    config["extra_javascript"] = []
+
+    result = add_search_loader(config)
+
+    assert result["extra_javascript"] == ["search/newsletter_search.js"]
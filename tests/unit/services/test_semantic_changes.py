@@ -7,6 +7,7 @@ fixture definition at conftest.py.
 
 import datetime
 import textwrap
+from pathlib import Path
 from textwrap import dedent
 
 import pytest
@@ -14,6 +15,7 @@ from dateutil import tz
 from git import Actor, Repo
 
 from mkdocs_newsletter import Change, semantic_changes
+from mkdocs_newsletter.model import ChangesCache
 
 author = Actor("An author", "author@example.com")
 committer = Actor("A committer", "committer@example.com")
@@ -175,6 +177,35 @@ def test_changes_dont_extract_commits_older_than_min_date(repo: Repo) -> None:
     assert result[0].summary == "New commit."
 
 
+@pytest.mark.freeze_time("2021-02-02T12:00:00")
+def test_changes_reuses_the_cached_changes(repo: Repo, tmp_path: Path) -> None:
+    """
+    Given: A mkdocs git repo whose changes were parsed and stored in the cache.
+    When: changes is called again with the cache
+    Then: The cached changes are returned.
+    """
+    repo.index.add(["mkdocs.yml"])
+    commit_date = datetime.datetime(2021, 2, 1, tzinfo=tz.tzlocal())
+    commit = repo.index.commit(
+        "feat: Cached commit",
+        author=author,
+        committer=committer,
+        author_date=commit_date,
+        commit_date=commit_date,
+    )
+    cache_dir = str(tmp_path / "cache")
+    semantic_changes(repo, cache_dir=cache_dir)
+    cache = ChangesCache.parse_file(f"{cache_dir}/changes.json")
+    cache.commits[commit.hexsha][0].summary = "Changed in the cache."
+    Path(f"{cache_dir}/changes.json").write_text(cache.json(), encoding="utf-8")
+
+    result = semantic_changes(repo, cache_dir=cache_dir)
+
+    assert len(result) == 1
+    assert result[0].summary == "Changed in the cache."
+    assert result[0].date == commit_date
+
+
 @pytest.mark.freeze_time("2021-02-02T12:00:00")
 def test_changes_extracts_commits_with_scope_with_spaced_subsection(repo: Repo) -> None:
     """
@@ -7,10 +7,13 @@ import pytest
 from dateutil import tz
 
 from mkdocs_newsletter.model import (
+    PERIODS,
     FeedEntry,
     LastNewsletter,
     Newsletter,
+    NewsletterLayout,
     NewsletterSection,
+    NewsletterType,
 )
 
 
@@ -118,3 +121,103 @@ def test_newsletter_handles_wrong_path(property_: str, message: str) -> None:
 
     with pytest.raises(ValueError, match=message):
         getattr(newsletter, property_)
+
+
+@pytest.mark.parametrize(
+    ("layout", "basename", "file_path"),
+    [
+        (NewsletterLayout.FLAT, "2021_02_08", "2021_02_08.md"),
+        (NewsletterLayout.YEAR, "2021_02_08", "2021/2021_02_08.md"),
+        (NewsletterLayout.YEAR, "2021", "2021/2021.md"),
+        (NewsletterLayout.MONTH, "2021_02_08", "2021/02/2021_02_08.md"),
+        (NewsletterLayout.MONTH, "2021_02", "2021/02/2021_02.md"),
+        (NewsletterLayout.MONTH, "2021_w06", "2021/2021_w06.md"),
+        (NewsletterLayout.MONTH, "2021_q1", "2021/2021_q1.md"),
+    ],
+)
+def test_newsletter_layout_builds_the_file_path(
+    layout: NewsletterLayout, basename: str, file_path: str
+) -> None:
+    """
+    Given: A newsletter layout and the basename of an article.
+    When: file_path is called.
+    Then: The path of the article relative to the newsletter directory is returned.
+    """
+    result = layout.file_path(basename)
+
+    assert result == file_path
+
+
+@pytest.mark.parametrize(
+    ("file_name", "type_", "date"),
+    [
+        ("2021.md", "yearly", datetime(2021, 1, 1)),
+        ("2021_q2.md", "quarterly", datetime(2021, 4, 1)),
+        ("2021_02.md", "monthly", datetime(2021, 2, 1)),
+        ("2021_w06.md", "weekly", datetime(2021, 2, 8)),
+        ("2021_02_08.md", "daily", datetime(2021, 2, 8)),
+    ],
+)
+def test_newsletter_parses_the_file_name(
+    file_name: str, type_: str, date: datetime
+) -> None:
+    """
+    Given: The file name of a newsletter of each type.
+    When: The Newsletter is created.
+    Then: The type and the date are extracted from the file name.
+    """
+    result = Newsletter(file_=Path(f"docs/newsletter/{file_name}"))
+
+    assert result.basename == file_name[:-3]
+    assert result.type_ == type_
+    assert result.date == date.replace(tzinfo=tz.tzlocal())
+
+
+@pytest.mark.parametrize(
+    ("type_", "key", "start", "next_start"),
+    [
+        (NewsletterType.YEARLY, "2021", datetime(2021, 1, 1), datetime(2022, 1, 1)),
+        (
+            NewsletterType.QUARTERLY,
+            "2021_q4",
+            datetime(2021, 10, 1),
+            datetime(2022, 1, 1),
+        ),
+        (
+            NewsletterType.MONTHLY,
+            "2021_12",
+            datetime(2021, 12, 1),
+            datetime(2022, 1, 1),
+        ),
+        (
+            NewsletterType.WEEKLY,
+            "2021_w52",
+            datetime(2021, 12, 27),
+            datetime(2022, 1, 1),
+        ),
+        (
+            NewsletterType.DAILY,
+            "2021_12_31",
+            datetime(2021, 12, 31),
+            datetime(2022, 1, 1),
+        ),
+    ],
+)
+def test_period_computes_boundaries_and_keys(
+    type_: NewsletterType, key: str, start: datetime, next_start: datetime
+) -> None:
+    """
+    Given: The last day of a year.
+    When: The period key and boundaries are computed.
+    Then: The periods are cut at the year boundary, and the key can be parsed back
+        into the start of the period.
+    """
+    period = PERIODS[type_]
+    date = datetime(2021, 12, 31, 12, tzinfo=tz.tzlocal())
+
+    result = period.key(date)
+
+    assert result == key
+    assert period.start(date) == start.replace(tzinfo=tz.tzlocal())
+    assert period.next_start(date) == next_start.replace(tzinfo=tz.tzlocal())
+    assert period.parse(key) == start.replace(tzinfo=tz.tzlocal())
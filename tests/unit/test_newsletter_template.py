@@ -2,11 +2,16 @@
 
 from datetime import datetime
 from textwrap import dedent
+from typing import List
 
+import pytest
 from dateutil import tz
 
 from mkdocs_newsletter.model import Change
-from mkdocs_newsletter.services.newsletter import create_newsletter
+from mkdocs_newsletter.services.newsletter import (
+    _collapse_blank_lines,
+    create_newsletter,
+)
 
 
 def test_newsletter_prints_level_1_change() -> None:
@@ -347,3 +352,169 @@ def test_template_group_changes_by_category() -> None:
 
         * New: Create the trees introduction page."""
     )
+
+
+def test_template_builds_the_sections_of_unsorted_changes() -> None:
+    """
+    Given: unsorted changes of a category, its subcategories and its files.
+    When: create_newsletter is called
+    Then: Each change is printed once in its section, the sections are ordered
+        according to the nav order and the changes in chronological order.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, 2, 10, tzinfo=tz.tzlocal()),
+            summary="Add terraform",
+            type_="feature",
+            file_="terraform.md",
+            category="DevOps",
+            category_order=0,
+            subcategory="Infrastructure as Code",
+            subcategory_order=0,
+            file_section="Terraform",
+            file_section_order=1,
+        ),
+        Change(
+            date=datetime(2021, 2, 9, tzinfo=tz.tzlocal()),
+            summary="Add monitoring",
+            type_="feature",
+            file_="monitoring.md",
+            category="DevOps",
+            category_order=0,
+            subcategory="Monitoring",
+            subcategory_order=1,
+        ),
+        Change(
+            date=datetime(2021, 2, 9, tzinfo=tz.tzlocal()),
+            summary="Add helm",
+            type_="feature",
+            file_="helm.md",
+            category="DevOps",
+            category_order=0,
+            subcategory="Infrastructure as Code",
+            subcategory_order=0,
+            file_section="Helm",
+            file_section_order=0,
+        ),
+        Change(
+            date=datetime(2021, 2, 10, tzinfo=tz.tzlocal()),
+            summary="Improve the devops introduction",
+            type_="performance",
+            file_="devops.md",
+            category="DevOps",
+            category_order=0,
+        ),
+        Change(
+            date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+            summary="Add the devops introduction",
+            type_="feature",
+            file_="devops.md",
+            category="DevOps",
+            category_order=0,
+        ),
+        Change(
+            date=datetime(2021, 2, 8, tzinfo=tz.tzlocal()),
+            summary="Add helm charts",
+            type_="feature",
+            file_="helm.md",
+            category="DevOps",
+            category_order=0,
+            subcategory="Infrastructure as Code",
+            subcategory_order=0,
+            file_section="Helm",
+            file_section_order=0,
+        ),
+    ]
+
+    result = create_newsletter(changes)
+
+    assert result == dedent(
+        """\
+        # [DevOps](devops.md)
+
+        * New: Add the devops introduction
+        * Improvement: Improve the devops introduction
+
+        ## Infrastructure as Code
+
+        ### [Helm](helm.md)
+
+        * New: Add helm charts
+        * New: Add helm
+
+        ### [Terraform](terraform.md)
+
+        * New: Add terraform
+
+        ## [Monitoring](monitoring.md)
+
+        * New: Add monitoring"""
+    )
+
+
+def test_newsletter_merges_repeated_changes_over_the_threshold() -> None:
+    """
+    Given: three feature changes and one fix of the same file, and a merge threshold
+        of two.
+    When: create_newsletter is called
+    Then: The feature changes are merged into one entry with the number of changes
+        and the list of their summaries, and the fix is kept as is.
+    """
+    changes = [
+        Change(
+            date=datetime(2021, 2, day, tzinfo=tz.tzlocal()),
+            summary=f"Add the {day}th tree.",
+            type_="feature",
+            message="A long description",
+            category="Botany",
+            category_order=0,
+            file_="trees.md",
+        )
+        for day in range(4, 7)
+    ]
+    changes.append(
+        Change(
+            date=datetime(2021, 2, 7, tzinfo=tz.tzlocal()),
+            summary="Correct the trees names.",
+            type_="fix",
+            category="Botany",
+            category_order=0,
+            file_="trees.md",
+        )
+    )
+
+    result = create_newsletter(changes, merge_threshold=2)
+
+    assert result == dedent(
+        """\
+        # [Botany](trees.md)
+
+        * New: 3 changes.
+
+            * Add the 4th tree.
+            * Add the 5th tree.
+            * Add the 6th tree.
+
+        * Correction: Correct the trees names."""
+    )
+
+
+@pytest.mark.parametrize(
+    ("chunks", "expected"),
+    [
+        (["\n\n# Title", "\n", "\n", "\n\n* Change\n\n"], "# Title\n\n* Change"),
+        (["  ", "\n", "# Title\n\n\n", "\n* Change", " \n"], "# Title\n\n* Change"),
+        (["# Title\n", "\n"], "# Title"),
+        (["\n", " "], ""),
+    ],
+)
+def test_collapse_blank_lines_across_chunks(chunks: List[str], expected: str) -> None:
+    """
+    Given: Chunks of a rendered article with blank lines split between them.
+    When: _collapse_blank_lines is called
+    Then: The blank lines are collapsed and the text stripped as if it was rendered
+        in one piece.
+    """
+    result = "".join(_collapse_blank_lines(chunks))
+
+    assert result == expected